@@ -0,0 +1,7 @@
+import os
+import sys
+
+# wizvid_src.py is a script, not a package: make it importable, and let Qt
+# run without a display.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'wizvid'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
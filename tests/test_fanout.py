@@ -0,0 +1,85 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+pytest.importorskip('PyQt6')
+pytest.importorskip('yt_dlp')
+
+import yt_dlp.utils  # noqa: E402
+from wizvid_src import FANOUT_TARGETS, FanOutPostProcessor, build_fanout_command  # noqa: E402
+
+
+def _ffmpeg():
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError:
+        return shutil.which('ffmpeg')
+
+
+FFMPEG = _ffmpeg()
+needs_ffmpeg = pytest.mark.skipif(FFMPEG is None, reason='needs ffmpeg')
+
+
+def _options_for(cmd, path):
+    """The options given to the output at path."""
+    end = cmd.index(path)
+    start = max(i for i, arg in enumerate(cmd[:end]) if arg == '-map_metadata')
+    return cmd[start:end]
+
+
+def test_command_carries_the_merger_fixups():
+    outputs = [(FANOUT_TARGETS['Best Video'], 'v.temp.mp4'), (FANOUT_TARGETS['MP3'], 'a.temp.mp3')]
+    cmd = build_fanout_command('ffmpeg', ['v.f1.mp4', 'a.f2.mp4'], 1080, outputs, 0, 1, aac_fixup=True)
+    video = _options_for(cmd, 'v.temp.mp4')
+    assert video[video.index('-bsf:a') + 1] == 'aac_adtstoasc'
+    assert video[video.index('-movflags') + 1] == '+faststart'
+    audio = _options_for(cmd, 'a.temp.mp3')
+    assert '-bsf:a' not in audio and '-movflags' not in audio
+
+    cmd = build_fanout_command('ffmpeg', ['v.mp4'], 1080, outputs[:1])
+    assert '-bsf:a' not in cmd
+
+
+def _make_streams(tmp_path):
+    video, audio = str(tmp_path / 'clip.f1.mp4'), str(tmp_path / 'clip.f2.m4a')
+    subprocess.run([FFMPEG, '-v', 'error', '-f', 'lavfi', '-i', 'testsrc=size=320x240:rate=10:duration=1',
+                    '-c:v', 'libx264', '-pix_fmt', 'yuv420p', video], check=True)
+    subprocess.run([FFMPEG, '-v', 'error', '-f', 'lavfi', '-i', 'sine=duration=1',
+                    '-c:a', 'aac', audio], check=True)
+    return video, audio
+
+
+def _merge_info(tmp_path, video, audio):
+    return {
+        'filepath': str(tmp_path / 'clip.mp4'), 'title': 'clip', 'height': 240,
+        '__files_to_merge': [video, audio],
+        'requested_formats': [
+            {'vcodec': 'avc1', 'acodec': 'none', 'protocol': 'https'},
+            {'vcodec': 'none', 'acodec': 'mp4a.40.2', 'protocol': 'https'},
+        ],
+    }
+
+
+@needs_ffmpeg
+def test_outputs_appear_only_after_ffmpeg_succeeds(tmp_path):
+    video, audio = _make_streams(tmp_path)
+    pp = FanOutPostProcessor(None, ['Best Video', 'MP3'], FFMPEG)
+    to_delete, info = pp.run(_merge_info(tmp_path, video, audio))
+    assert to_delete == [video, audio]
+    assert pp.extra_outputs == [str(tmp_path / 'clip.mp3')]
+    assert sorted(os.listdir(tmp_path)) == ['clip.f1.mp4', 'clip.f2.m4a', 'clip.mp3', 'clip.mp4']
+
+
+@needs_ffmpeg
+def test_failed_pass_leaves_no_file_at_the_final_names(tmp_path):
+    video, audio = _make_streams(tmp_path)
+    with open(audio, 'r+b') as f:
+        f.truncate(64)   # an audio stream ffmpeg cannot read
+    pp = FanOutPostProcessor(None, ['Best Video', 'MP3'], FFMPEG)
+    with pytest.raises(yt_dlp.utils.PostProcessingError):
+        pp.run(_merge_info(tmp_path, video, audio))
+    assert sorted(os.listdir(tmp_path)) == ['clip.f1.mp4', 'clip.f2.m4a']
+    assert pp.extra_outputs == []
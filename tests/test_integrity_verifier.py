@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+pytest.importorskip('PyQt6')
+pytest.importorskip('yt_dlp')
+
+from wizvid_src import CHECKSUM_INDEX_NAME, IntegrityVerifier  # noqa: E402
+
+
+def test_index_write_errors_are_reported_per_file(tmp_path):
+    good = tmp_path / 'good.mp4'
+    good.write_bytes(b'x' * 100)
+    gone = tmp_path / 'gone.mp4'
+    verifier = IntegrityVerifier()
+    try:
+        verifier.submit(str(good), 'https://a.example/good')
+        # Hashed while downloading, then removed before the index entry is written.
+        verifier.submit(str(gone), 'https://a.example/gone', checksum=('sha256', 'ab' * 32))
+        bad = verifier.collect(wait=True)
+    finally:
+        verifier.shutdown()
+    assert [(path, url) for path, url, _problem in bad] == [(str(gone), 'https://a.example/gone')]
+    assert 'could not record checksum' in bad[0][2]
+    with open(tmp_path / CHECKSUM_INDEX_NAME, encoding='utf-8') as f:
+        assert [json.loads(line)['file'] for line in f] == ['good.mp4']
+
+
+def test_unwritable_index_does_not_abort_the_batch(tmp_path):
+    paths = []
+    for name in ('a.mp4', 'b.mp4'):
+        (tmp_path / name).write_bytes(b'x')
+        paths.append(str(tmp_path / name))
+    (tmp_path / CHECKSUM_INDEX_NAME).mkdir()   # opening it for append fails, even as root
+    verifier = IntegrityVerifier()
+    try:
+        for path in paths:
+            verifier.submit(path, path)
+        bad = verifier.collect(wait=True)
+    finally:
+        verifier.shutdown()
+    assert sorted(path for path, _url, _problem in bad) == paths
@@ -0,0 +1,303 @@
+import http.server
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import pytest
+
+pytest.importorskip('PyQt6')
+pytest.importorskip('yt_dlp')
+
+from PyQt6.QtCore import Qt  # noqa: E402
+import yt_dlp.utils  # noqa: E402
+import wizvid_src  # noqa: E402
+from wizvid_src import DownloadWorker, IntegrityVerifier, RetryScheduler  # noqa: E402
+
+# The request: pause and cancel release everything "well under a second".
+LATENCY_LIMIT = 0.5
+FILE_SIZE = 10 ** 7
+FIRST_CHUNK = 1024
+
+
+class StallingHandler(http.server.BaseHTTPRequestHandler):
+    """Sends the first kilobyte of a big file, then stalls until the client hangs up."""
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('Range')))
+        start = 0
+        if self.headers.get('Range'):
+            start = int(self.headers['Range'].split('=')[1].split('-')[0])
+        self.send_response(206 if start else 200)
+        self.send_header('Content-Length', str(FILE_SIZE - start))
+        self.end_headers()
+        self.wfile.write(b'x' * FIRST_CHUNK)
+        self.wfile.flush()
+        self.rfile.read(1)   # returns only once the client shuts the connection
+        self.server.closed_at.append(time.perf_counter())
+
+    def log_message(self, *args):
+        pass
+
+
+class StubYoutubeDL:
+    """
+    The parts of yt_dlp.YoutubeDL that DownloadWorker uses. Network access
+    goes through self.urlopen, like yt-dlp's extractors and HttpFD, so the
+    worker's interrupt points apply. The URL path picks the stage a job
+    gets stuck in: extract, download, backoff, postprocess or verify.
+    """
+
+    def __init__(self, params):
+        self.params = params
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def urlopen(self, req):
+        return urllib.request.urlopen(req, timeout=20)   # yt-dlp's default socket_timeout
+
+    def report_error(self, message, *args, **kwargs):
+        raise yt_dlp.utils.DownloadError(message)
+
+    def extract_info(self, url, download=False):
+        if url.endswith('/extract'):
+            self.urlopen(url).read()
+        return {'_type': 'video', 'id': 'x', 'title': 'x'}
+
+    def download(self, urls):
+        for url in urls:
+            stage = urllib.parse.urlsplit(url).path.strip('/')
+            final = os.path.join(self.params['outdir'], stage + '.mp4')
+            info = {'_filename': final, 'webpage_url': url}
+            if stage == 'backoff':
+                raise yt_dlp.utils.DownloadError('HTTP Error 503: Service Unavailable')
+            if stage == 'download':
+                self._fetch(url, final, info)
+            if stage == 'postprocess':
+                self._postprocess(final, info)
+            if stage == 'verify':
+                with open(final, 'wb') as f:
+                    f.write(b'x' * FIRST_CHUNK)
+                for hook in self.params['post_hooks']:
+                    hook(final)
+        return 0
+
+    def _fetch(self, url, final, info):
+        part = final + '.part'
+        start = os.path.getsize(part) if os.path.exists(part) else 0
+        request = urllib.request.Request(url, headers={'Range': f'bytes={start}-'} if start else {})
+        with self.urlopen(request) as response, open(part, 'ab') as f:
+            while True:
+                chunk = response.read(FIRST_CHUNK)
+                if not chunk:
+                    raise yt_dlp.utils.DownloadError('Content too short')
+                f.write(chunk)
+                f.flush()
+                for hook in self.params['progress_hooks']:
+                    hook({'status': 'downloading', 'filename': final, 'tmpfilename': part,
+                          'downloaded_bytes': f.tell(), 'info_dict': info})
+
+    def _postprocess(self, final, info):
+        # A "merge" that writes part of its output, then takes a long time.
+        with open(final[:-len('.mp4')] + '.temp.mp4', 'wb') as f:
+            f.write(b'x' * FIRST_CHUNK)
+        for hook in self.params['postprocessor_hooks']:
+            hook({'status': 'started', 'postprocessor': 'Merger', 'info_dict': info})
+        proc = yt_dlp.utils.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+        if proc.wait() != 0:
+            raise yt_dlp.utils.PostProcessingError('ffmpeg exited with an error')
+
+
+class WorkerRun:
+    """Runs a DownloadWorker in a thread and timestamps what it reports."""
+
+    def __init__(self, tmp_path, url, scheduler=None, verifier=None):
+        self.tmp_path = tmp_path
+        options = {'outtmpl': str(tmp_path / '%(title)s.%(ext)s'), 'outdir': str(tmp_path)}
+        self.worker = DownloadWorker([url], options, scheduler=scheduler, verifier=verifier)
+        self.paused = threading.Event()
+        self.cancelled = threading.Event()
+        self.retrying = threading.Event()
+        self.times = {}
+        self.errors = []
+        direct = Qt.ConnectionType.DirectConnection
+        self.worker.control_signal.connect(self._on_control, direct)
+        self.worker.cancelled_signal.connect(lambda: self._mark('cancelled', self.cancelled), direct)
+        self.worker.retry_signal.connect(lambda msg: self.retrying.set(), direct)
+        self.worker.error_signal.connect(self.errors.append, direct)
+        self.thread = threading.Thread(target=self.worker.run, daemon=True)
+        self.thread.start()
+
+    def _on_control(self, message):
+        if 'Paused' in message:
+            self._mark('paused', self.paused)
+
+    def _mark(self, name, event):
+        self.times[name] = time.perf_counter()
+        event.set()
+
+    def pause(self):
+        self.paused.clear()
+        started = time.perf_counter()
+        self.worker.pause()
+        return started
+
+    def cancel(self):
+        started = time.perf_counter()
+        self.worker.cancel()
+        return started
+
+    def stage_files(self):
+        return sorted(name for name in os.listdir(self.tmp_path) if not name.startswith('.'))
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(wizvid_src.yt_dlp, 'YoutubeDL', StubYoutubeDL)
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StallingHandler)
+    httpd.daemon_threads = True
+    httpd.requests, httpd.closed_at = [], []
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _url(server, stage):
+    return f'http://127.0.0.1:{server.server_port}/{stage}'
+
+
+def _wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _assert_cancelled_quickly(run, started):
+    assert run.cancelled.wait(5), run.errors
+    assert run.times['cancelled'] - started < LATENCY_LIMIT
+    run.thread.join(2)
+    assert not run.thread.is_alive()
+    assert run.errors == []
+
+
+def test_pause_and_cancel_during_extraction(server, tmp_path):
+    run = WorkerRun(tmp_path, _url(server, 'extract'))
+    assert _wait_for(lambda: len(server.requests) == 1)
+
+    started = run.pause()
+    assert run.paused.wait(5)
+    assert run.times['paused'] - started < LATENCY_LIMIT
+    assert _wait_for(lambda: server.closed_at, LATENCY_LIMIT)   # the stalled connection is gone
+
+    run.worker.resume()
+    assert _wait_for(lambda: len(server.requests) == 2)
+    _assert_cancelled_quickly(run, run.cancel())
+
+
+def test_pause_resumes_with_range_and_cancel_removes_part_file(server, tmp_path):
+    run = WorkerRun(tmp_path, _url(server, 'download'))
+    part = tmp_path / 'download.mp4.part'
+    assert _wait_for(lambda: part.exists() and part.stat().st_size == FIRST_CHUNK)
+
+    started = run.pause()
+    assert run.paused.wait(5)
+    assert run.times['paused'] - started < LATENCY_LIMIT
+    assert _wait_for(lambda: server.closed_at, LATENCY_LIMIT)
+    assert part.stat().st_size == FIRST_CHUNK   # kept for resuming
+
+    run.worker.resume()
+    assert _wait_for(lambda: len(server.requests) == 2)
+    assert server.requests[1][1] == f'bytes={FIRST_CHUNK}-'
+    assert _wait_for(lambda: part.stat().st_size == 2 * FIRST_CHUNK)
+
+    _assert_cancelled_quickly(run, run.cancel())
+    assert _wait_for(lambda: len(server.closed_at) == 2, LATENCY_LIMIT)
+    assert run.stage_files() == []
+
+
+def test_cancel_removes_only_files_this_job_wrote(server, tmp_path):
+    # Finished and in-progress files of other jobs whose names share the prefix.
+    others = ['download Part 2.mp4', 'download Part 2.mp4.part', 'download.mp4.part.bak', 'download.en.vtt']
+    for name in others:
+        (tmp_path / name).write_bytes(b'keep')
+    run = WorkerRun(tmp_path, _url(server, 'download'))
+    part = tmp_path / 'download.mp4.part'
+    assert _wait_for(lambda: part.exists() and part.stat().st_size == FIRST_CHUNK)
+    (tmp_path / 'download.mp4.part-Frag3').write_bytes(b'x')   # as a fragmented download would
+    (tmp_path / 'download.mp4.part-Frag4.part').write_bytes(b'x')
+
+    _assert_cancelled_quickly(run, run.cancel())
+    assert run.stage_files() == sorted(others)
+    assert all((tmp_path / name).read_bytes() == b'keep' for name in others)
+
+
+def test_pause_and_cancel_during_backoff(server, tmp_path):
+    # The first failure backs the host off for a minute or more.
+    scheduler = RetryScheduler(base_delay=120.0, max_delay=120.0, rng=random.Random(0))
+    run = WorkerRun(tmp_path, _url(server, 'backoff'), scheduler=scheduler)
+    assert run.retrying.wait(10)
+
+    started = run.pause()
+    assert run.paused.wait(5)
+    assert run.times['paused'] - started < LATENCY_LIMIT
+
+    run.worker.resume()
+    _assert_cancelled_quickly(run, run.cancel())
+
+
+def _process_state(pid):
+    with open(f'/proc/{pid}/stat', encoding='ascii') as f:
+        return f.read().rsplit(')', 1)[1].split()[0]
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='reads process states from /proc')
+def test_pause_stops_and_cancel_terminates_postprocessing(server, tmp_path):
+    run = WorkerRun(tmp_path, _url(server, 'postprocess'))
+    assert _wait_for(lambda: wizvid_src._live_children())
+    child = wizvid_src._live_children()[0]
+
+    started = run.pause()
+    assert run.paused.wait(5)
+    assert run.times['paused'] - started < LATENCY_LIMIT
+    assert _wait_for(lambda: _process_state(child.pid) == 'T', LATENCY_LIMIT)
+
+    run.worker.resume()
+    assert _wait_for(lambda: _process_state(child.pid) != 'T', LATENCY_LIMIT)
+
+    _assert_cancelled_quickly(run, run.cancel())
+    assert child.poll() is not None
+    assert run.stage_files() == []
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='reads process states from /proc')
+def test_pause_and_cancel_while_verifying(server, tmp_path, tmp_path_factory):
+    # An ffprobe that hangs, so the batch sits in its final verification wait.
+    ffprobe = tmp_path_factory.mktemp('bin') / 'ffprobe'
+    ffprobe.write_text(f'#!{sys.executable}\nimport time\ntime.sleep(60)\n')
+    ffprobe.chmod(0o755)
+    run = WorkerRun(tmp_path, _url(server, 'verify'), verifier=IntegrityVerifier(str(ffprobe)))
+    assert _wait_for(lambda: wizvid_src._live_children())
+    child = wizvid_src._live_children()[0]
+
+    started = run.pause()
+    assert run.paused.wait(5)
+    assert run.times['paused'] - started < LATENCY_LIMIT
+    assert _wait_for(lambda: _process_state(child.pid) == 'T', LATENCY_LIMIT)
+
+    run.worker.resume()
+    assert _wait_for(lambda: _process_state(child.pid) != 'T', LATENCY_LIMIT)
+
+    _assert_cancelled_quickly(run, run.cancel())
+    assert _wait_for(lambda: child.poll() is not None, LATENCY_LIMIT)
+    assert run.stage_files() == ['verify.mp4']   # finished downloads are kept
@@ -0,0 +1,53 @@
+import pstats
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+pytest.importorskip('PyQt6')
+pytest.importorskip('yt_dlp')
+
+import wizvid_src  # noqa: E402
+from wizvid_src import ProfilingSession  # noqa: E402
+
+
+def busy_alpha(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def busy_beta(stop):
+    while not stop.is_set():
+        sorted(range(1000), reverse=True)
+
+
+def _functions(paths):
+    return {func for (_file, _line, func) in pstats.Stats(*paths).stats}
+
+
+@pytest.mark.parametrize('per_thread_cprofile', [True, False], ids=['cProfile', 'profile'])
+def test_concurrent_workers_get_separate_stats(monkeypatch, tmp_path, per_thread_cprofile):
+    if per_thread_cprofile and not wizvid_src.PER_THREAD_CPROFILE:
+        pytest.skip('cProfile is process-wide on this Python')
+    monkeypatch.setattr(wizvid_src, 'PER_THREAD_CPROFILE', per_thread_cprofile)
+    session = ProfilingSession(str(tmp_path))
+    try:
+        stop = threading.Event()
+        threads = [threading.Thread(target=session.profile_call, args=(name, func, stop))
+                   for name, func in (('Alpha', busy_alpha), ('Beta', busy_beta))]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)   # both profilers are running at the same time
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        alpha, beta = _functions(session.profiles['Alpha']), _functions(session.profiles['Beta'])
+        assert 'busy_alpha' in alpha and 'busy_beta' not in alpha
+        assert 'busy_beta' in beta and 'busy_alpha' not in beta
+        report = session.build_report()
+        assert 'Alpha (1 run(s))' in report and 'Beta (1 run(s))' in report
+        assert ('pure-Python profile module' in report) is not per_thread_cprofile
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,168 @@
+import random
+
+import pytest
+
+pytest.importorskip('PyQt6')
+pytest.importorskip('yt_dlp')
+
+from wizvid_src import RetryScheduler  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def _scheduler(clock, **kwargs):
+    kwargs.setdefault('rng', random.Random(1))
+    return RetryScheduler(clock=clock, **kwargs)
+
+
+def _drain_ready(scheduler):
+    """Hand out every job that is runnable right now, in order."""
+    jobs = []
+    while True:
+        job, _wait = scheduler.next_job()
+        if job is None:
+            return jobs
+        jobs.append(job)
+
+
+def test_hosts_are_served_round_robin():
+    scheduler = _scheduler(FakeClock())
+    for url in ('https://a.example/1', 'https://a.example/2', 'https://a.example/3',
+                'https://b.example/1', 'https://c.example/1'):
+        scheduler.add(url)
+    order = [job.url for job in _drain_ready(scheduler)]
+    assert order == ['https://a.example/1', 'https://b.example/1', 'https://c.example/1',
+                     'https://a.example/2', 'https://a.example/3']
+    assert scheduler.next_job() == (None, None)
+
+
+def test_backoff_grows_exponentially_within_equal_jitter_bounds():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, base_delay=2.0, max_delay=10.0, failure_threshold=10, max_attempts=10)
+    scheduler.add('https://a.example/1')
+    for failure, cap in enumerate((2.0, 4.0, 8.0, 10.0, 10.0), start=1):
+        job, _ = scheduler.next_job()
+        delay = scheduler.record_failure(job, 'HTTP Error 503')
+        assert cap / 2 <= delay <= cap, (failure, delay)
+        # The host is parked until the delay has passed.
+        assert scheduler.next_job() == (None, pytest.approx(delay))
+        clock.advance(delay)
+
+
+def test_circuit_opens_probes_half_open_and_closes_on_success():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, failure_threshold=3, cooldown=120.0, max_attempts=10)
+    scheduler.add('https://a.example/1')
+    scheduler.add('https://a.example/2')
+    state = scheduler.host_state('a.example')
+    for _ in range(3):
+        clock.advance(60)
+        job, _ = scheduler.next_job()
+        delay = scheduler.record_failure(job, 'timed out')
+    assert state.circuit == 'open' and delay == 120.0
+    assert scheduler.runnable_pending() == 0 and scheduler.pending() == 2
+
+    clock.advance(119)
+    assert scheduler.next_job() == (None, pytest.approx(1.0))
+    clock.advance(1)
+    probe, _ = scheduler.next_job()
+    assert probe.url == 'https://a.example/1' and state.circuit == 'half-open'
+    scheduler.record_success(probe)
+    assert state.circuit == 'closed' and state.consecutive_failures == 0
+    job, _ = scheduler.next_job()
+    assert job.url == 'https://a.example/2'
+
+
+def test_failed_probe_reopens_and_fails_everything_parked():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, failure_threshold=1, cooldown=120.0, max_attempts=10)
+    for i in range(4):
+        scheduler.add(f'https://a.example/{i}')
+    job, _ = scheduler.next_job()
+    scheduler.record_failure(job, 'timed out')
+    clock.advance(120)
+    probe, _ = scheduler.next_job()
+    assert scheduler.record_failure(probe, 'timed out') == 120.0
+    state = scheduler.host_state('a.example')
+    assert state.circuit == 'open'
+    # Only the probe job stays queued for the next probe.
+    assert scheduler.pending() == 1
+    assert sorted(job.url for job in scheduler.failed) == [
+        'https://a.example/1', 'https://a.example/2', 'https://a.example/3']
+    assert all('not responding' in job.last_error for job in scheduler.failed)
+
+
+def test_open_circuit_parks_at_most_max_parked_jobs():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, failure_threshold=1, max_parked=3)
+    for i in range(10):
+        scheduler.add(f'https://a.example/{i}')
+    job, _ = scheduler.next_job()
+    scheduler.record_failure(job, 'timed out')
+    # The failed job goes back in front of the 3 kept; the newest 6 were shed.
+    assert scheduler.pending() == 4
+    assert [job.url for job in scheduler.failed] == [f'https://a.example/{i}' for i in range(9, 3, -1)]
+    # New jobs for the open host fail fast.
+    late = scheduler.add('https://a.example/late')
+    assert scheduler.failed[-1] is late and scheduler.pending() == 4
+
+
+def test_permanent_errors_fail_immediately_without_penalising_the_host():
+    scheduler = _scheduler(FakeClock())
+    scheduler.add('https://a.example/gone')
+    scheduler.add('https://a.example/fine')
+    job, _ = scheduler.next_job()
+    assert scheduler.record_failure(job, 'ERROR: HTTP Error 404: Not Found') is None
+    assert scheduler.failed == [job]
+    state = scheduler.host_state('a.example')
+    assert state.consecutive_failures == 0 and state.circuit == 'closed'
+    job, wait = scheduler.next_job()
+    assert job.url == 'https://a.example/fine' and wait is None
+
+
+def test_jobs_give_up_after_max_attempts():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, max_attempts=2, failure_threshold=10)
+    scheduler.add('https://a.example/1')
+    job, _ = scheduler.next_job()
+    assert scheduler.record_failure(job, 'timed out') is not None
+    clock.advance(60)
+    job, _ = scheduler.next_job()
+    assert job.attempts == 2
+    assert scheduler.record_failure(job, 'timed out') is None
+    assert scheduler.failed == [job] and scheduler.next_job() == (None, None)
+
+
+def test_healthy_hosts_keep_flowing_while_one_circuit_is_open():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, failure_threshold=3, cooldown=120.0)
+    for i in range(20):
+        scheduler.add(f'https://dead.example/{i}')
+        scheduler.add(f'https://ok.example/{i}')
+    finished = []
+    # Simulate a batch: every job takes one second; dead.example always fails.
+    while clock.now < 1000.0 + 100:
+        job, wait = scheduler.next_job()
+        if job is None:
+            clock.advance(wait)
+            continue
+        clock.advance(1.0)
+        if job.host == 'dead.example':
+            scheduler.record_failure(job, 'HTTP Error 503')
+        else:
+            scheduler.record_success(job)
+            finished.append(job.url)
+    assert scheduler.host_state('dead.example').circuit == 'open'
+    # All healthy jobs were done well inside the dead host's first cooldown,
+    # at close to one job per second.
+    assert finished == [f'https://ok.example/{i}' for i in range(20)]
+    assert scheduler.succeeded == 20
@@ -0,0 +1,139 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+pytest.importorskip('PyQt6')
+pytest.importorskip('yt_dlp')
+
+import wizvid_src  # noqa: E402
+from wizvid_src import FileJobQueue  # noqa: E402
+
+WIZVID_DIR = os.path.dirname(os.path.abspath(wizvid_src.__file__))
+
+# A worker process whose yt_dlp.YoutubeDL is replaced by a stub that "downloads"
+# a URL by appending 1000 bytes to a file named after the job. With
+# STUB_HANG_ON set it hangs on matching URLs instead, like a stuck download.
+WORKER_SCRIPT = r'''
+import os, sys, time
+sys.path.insert(0, sys.argv[1])
+import wizvid_src
+
+
+class StubYoutubeDL:
+    def __init__(self, params):
+        self.params = params
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def download(self, urls):
+        for url in urls:
+            if os.environ.get('STUB_HANG_ON', '\0') in url:
+                time.sleep(3600)
+            time.sleep(0.05)
+            path = os.path.join(self.params['outdir'], wizvid_src.FileJobQueue.job_id(url))
+            with open(path, 'ab') as f:
+                f.write(b'x' * 1000)
+            for hook in self.params['progress_hooks']:
+                hook({'status': 'finished', 'filename': path, 'total_bytes': 1000})
+        return 0
+
+
+wizvid_src.yt_dlp.YoutubeDL = StubYoutubeDL
+queue = wizvid_src.FileJobQueue(sys.argv[2], lease_seconds=float(sys.argv[3]))
+wizvid_src.FleetWorker(queue, {'outdir': sys.argv[4]}, worker_id=sys.argv[5], poll_interval=0.1).run()
+'''
+
+
+def _start_worker(queue_dir, out_dir, worker_id, lease_seconds, hang_on=None):
+    env = dict(os.environ)
+    if hang_on is not None:
+        env['STUB_HANG_ON'] = hang_on
+    return subprocess.Popen(
+        [sys.executable, '-c', WORKER_SCRIPT, WIZVID_DIR, queue_dir, str(lease_seconds), out_dir, worker_id],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+
+def _wait_for(predicate, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_fleet_reclaims_killed_worker_and_drains(tmp_path):
+    queue_dir, out_dir = str(tmp_path / 'queue'), str(tmp_path / 'out')
+    os.makedirs(out_dir)
+    lease_seconds = 2
+    queue = FileJobQueue(queue_dir, lease_seconds=lease_seconds)
+    urls = [f'https://host{i % 3}.example/video{i}' for i in range(30)]
+    assert sum(queue.enqueue(url) for url in urls) == 30
+    started = time.time()
+
+    # The victim leases one job, hangs on it and is killed without releasing it.
+    victim = _start_worker(queue_dir, out_dir, 'victim', lease_seconds, hang_on='/')
+    leased = lambda: [name for name in os.listdir(os.path.join(queue_dir, 'leased')) if '@victim@' in name]
+    try:
+        assert _wait_for(leased, 30), 'victim never leased a job'
+        victim_job = leased()[0].split('@')[0]
+    finally:
+        victim.kill()
+        victim.communicate()
+
+    workers = [_start_worker(queue_dir, out_dir, f'w{i}', lease_seconds) for i in range(3)]
+    logs = [proc.communicate(timeout=120)[0] for proc in workers]
+    assert [proc.returncode for proc in workers] == [0, 0, 0], logs
+    assert any('reclaimed 1 expired lease' in log for log in logs), logs
+
+    assert queue.counts() == {'pending': 0, 'leased': 0, 'done': 30, 'failed': 0}
+    with open(os.path.join(queue_dir, 'done', victim_job + '.json'), encoding='utf-8') as f:
+        record = json.load(f)
+    assert record['worker'] != 'victim'
+    assert record['attempts'] == 1   # the lost lease counts as an attempt
+    # Every job ran exactly once to completion, spread over several workers.
+    sizes = {name: os.path.getsize(os.path.join(out_dir, name)) for name in os.listdir(out_dir)}
+    assert sorted(sizes) == sorted(FileJobQueue.job_id(url) for url in urls)
+    assert set(sizes.values()) == {1000}
+    assert sum(1 for log in logs if ' done ' in log) >= 2
+    jobs, total_bytes, seconds = queue.throughput(since=started)
+    assert (jobs, total_bytes) == (30, 30000) and seconds > 0
+
+
+def test_enqueue_skips_a_leased_job(tmp_path):
+    queue = FileJobQueue(str(tmp_path))
+    assert queue.enqueue('https://example.com/a')
+    lease = queue.claim('w1')
+    assert not queue.enqueue('https://example.com/a')
+    assert queue.counts()['pending'] == 0
+    queue.complete(lease, {})
+    assert not queue.enqueue('https://example.com/a')
+
+
+def test_expired_leases_count_as_attempts(tmp_path):
+    # Leases that are expired as soon as they are taken: every claim "crashes".
+    queue = FileJobQueue(str(tmp_path), lease_seconds=-10, max_attempts=2)
+    queue.enqueue('https://example.com/crashes-its-worker')
+    assert queue.claim('w1') is not None
+    assert queue.reap_expired() == 1
+    assert queue.counts()['pending'] == 1
+    assert queue.claim('w2').job['attempts'] == 1
+    assert queue.reap_expired() == 1
+    assert queue.counts() == {'pending': 0, 'leased': 0, 'done': 0, 'failed': 1}
+
+
+def test_throughput_ignores_jobs_from_earlier_runs(tmp_path):
+    queue = FileJobQueue(str(tmp_path))
+    for url, finished in (('https://example.com/old', 100.0), ('https://example.com/new', 200.0)):
+        queue.enqueue(url)
+        queue.complete(queue.claim('w'), {'started': finished - 10, 'finished': finished, 'bytes': 5})
+    assert queue.throughput() == (2, 10, 110.0)
+    assert queue.throughput(since=150.0) == (1, 5, 10.0)
@@ -0,0 +1,127 @@
+import http.server
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+pytest.importorskip('PyQt6')
+pytest.importorskip('yt_dlp')
+
+from PyQt6.QtCore import Qt  # noqa: E402
+import wizvid_src  # noqa: E402
+from wizvid_src import YtDlpUpdateWorker, fetch_latest_ytdlp_version  # noqa: E402
+
+DAY = 24 * 60 * 60
+
+
+class PyPIHandler(http.server.BaseHTTPRequestHandler):
+    """Serves PyPI-style JSON for yt-dlp with an ETag, honouring If-None-Match."""
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        etag = f'"{self.server.version}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps({'info': {'version': self.server.version}}).encode()
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def pypi():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), PyPIHandler)
+    httpd.daemon_threads = True
+    httpd.requests, httpd.version = [], '2025.01.15'
+    httpd.url = f'http://127.0.0.1:{httpd.server_port}/pypi/yt-dlp/json'
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_version_check_uses_cache_window_then_conditional_request(pypi):
+    cache = {}
+    assert fetch_latest_ytdlp_version(cache, pypi.url, DAY, now=0) == ('2025.01.15', 'fetched')
+    assert cache['etag'] == '"2025.01.15"' and len(pypi.requests) == 1
+
+    # Inside the interval nothing goes over the network.
+    assert fetch_latest_ytdlp_version(cache, pypi.url, DAY, now=DAY - 1) == ('2025.01.15', 'cache')
+    assert len(pypi.requests) == 1
+
+    # After it, unchanged metadata is answered with a 304.
+    assert fetch_latest_ytdlp_version(cache, pypi.url, DAY, now=DAY) == ('2025.01.15', 'not-modified')
+    assert pypi.requests[-1]['If-None-Match'] == '"2025.01.15"'
+    assert cache['checked_at'] == DAY
+
+    # A release changes the ETag, so the next check after the window sees it.
+    pypi.version = '2025.02.19'
+    assert fetch_latest_ytdlp_version(cache, pypi.url, DAY, now=DAY + 1)[1] == 'cache'
+    assert fetch_latest_ytdlp_version(cache, pypi.url, DAY, now=2 * DAY) == ('2025.02.19', 'fetched')
+    assert len(pypi.requests) == 3
+
+
+class MemorySettings:
+    store = {}
+
+    def __init__(self, *args):
+        pass
+
+    def value(self, key, default=None):
+        return self.store.get(key, default)
+
+    def setValue(self, key, value):
+        self.store[key] = value
+
+
+def _run_update_worker(pypi, monkeypatch, tmp_path, installed):
+    monkeypatch.setattr(wizvid_src, 'QSettings', MemorySettings)
+    monkeypatch.setattr(MemorySettings, 'store', {})
+    monkeypatch.setattr(wizvid_src.yt_dlp.version, '__version__', installed)
+    staged = []
+    monkeypatch.setattr(wizvid_src, 'stage_ytdlp',
+                        lambda version, **kwargs: staged.append(version) or (True, str(tmp_path)))
+    worker = YtDlpUpdateWorker(json_url=pypi.url, stage_root=str(tmp_path))
+    messages = []
+    worker.status.connect(messages.append, Qt.ConnectionType.DirectConnection)
+    worker.run()
+    return staged, messages
+
+
+def test_update_worker_stages_only_newer_versions(pypi, monkeypatch, tmp_path):
+    staged, _ = _run_update_worker(pypi, monkeypatch, tmp_path, installed='2024.12.23')
+    assert staged == ['2025.01.15']
+
+    # A nightly ahead of PyPI is never downgraded.
+    staged, messages = _run_update_worker(pypi, monkeypatch, tmp_path, installed='2025.01.16.232854')
+    assert staged == [] and 'up to date' in messages[-1]
+
+
+def _stage(stage_root, version):
+    os.makedirs(os.path.join(stage_root, version, 'yt_dlp'))
+    with open(os.path.join(stage_root, 'active.json'), 'w', encoding='utf-8') as f:
+        json.dump({'version': version}, f)
+
+
+@pytest.mark.parametrize('installed, activated', [
+    ('2024.12.23', True),     # staged copy is newer
+    ('2025.01.15', False),    # same version
+    ('2025.03.31', False),    # upgraded by hand since staging: do not shadow it
+    (None, True),             # no installed distribution metadata
+])
+def test_staged_copy_is_only_activated_when_newer(monkeypatch, tmp_path, installed, activated):
+    _stage(str(tmp_path), '2025.01.15')
+    monkeypatch.setattr(wizvid_src, '_installed_ytdlp_version', lambda: installed)
+    monkeypatch.setattr(sys, 'path', list(sys.path))
+    result = wizvid_src._activate_staged_ytdlp(str(tmp_path))
+    assert (result == '2025.01.15') is activated
+    assert (sys.path[0] == str(tmp_path / '2025.01.15')) is activated
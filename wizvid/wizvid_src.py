@@ -1,71 +1,439 @@
 import sys
 import re
 import json
-import yt_dlp
 import os
 import shutil
+import importlib.metadata
+
+
+# ---------------------------------------------------------------------------
+# Staged yt-dlp activation (must run before yt_dlp is imported)
+# ---------------------------------------------------------------------------
+
+def _ytdlp_stage_root():
+    """Directory next to this script where yt-dlp upgrades are staged."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "ytdlp_staged")
+
+
+def _staged_ytdlp_version(stage_root=None):
+    """Return the version named by the stage pointer file, or None."""
+    try:
+        with open(os.path.join(stage_root or _ytdlp_stage_root(), "active.json"), "r", encoding="utf-8") as f:
+            return json.load(f)["version"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _version_key(version):
+    """Same ordering as yt_dlp.utils.version_tuple(lenient=True), usable before yt_dlp is imported."""
+    return tuple(int(part) if part.isdigit() else -1 for part in re.split(r"[-.]", version))
+
+
+def _installed_ytdlp_version():
+    try:
+        return importlib.metadata.version("yt-dlp")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _activate_staged_ytdlp(stage_root=None):
+    """
+    Put a yt-dlp staged by a previous update check in front of sys.path,
+    but only if it is newer than the installed one – after a manual
+    `pip install -U yt-dlp` the stale staged copy must not shadow it.
+    The running interpreter's site-packages is never touched, so an
+    interrupted upgrade cannot break the app. Nothing is deleted here:
+    this runs on every import, including each --workers process.
+    """
+    stage_root = stage_root or _ytdlp_stage_root()
+    version = _staged_ytdlp_version(stage_root)
+    if not version:
+        return None
+    staged_dir = os.path.join(stage_root, version)
+    if not os.path.isdir(os.path.join(staged_dir, "yt_dlp")):
+        return None
+    installed = _installed_ytdlp_version()
+    if installed and _version_key(version) <= _version_key(installed):
+        return None
+    sys.path.insert(0, staged_dir)
+    return version
+
+
+_activate_staged_ytdlp()
+
+import yt_dlp  # noqa: E402  (after _activate_staged_ytdlp on purpose)
+from yt_dlp.postprocessor import FFmpegMergerPP, PostProcessor  # noqa: E402
+from yt_dlp.utils import DownloadError, Popen, PostProcessingError, prepend_extension  # noqa: E402
 import zipfile
 import tarfile
 import urllib.request
+import urllib.parse
+import urllib.error
 import subprocess
 import platform
+import random
+import collections
+import hashlib
+import threading
+import concurrent.futures
+import itertools
+import argparse
+import functools
+import io
+import cProfile
+import profile
+import pstats
+import tracemalloc
+import signal
+import socket
+import weakref
 from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QTextEdit, QPushButton, QFileDialog, \
-    QProgressBar, QComboBox, QGraphicsOpacityEffect, QHBoxLayout, QDialog, QMessageBox
-from PyQt6.QtCore import QPropertyAnimation, QEasingCurve, Qt, QUrl, QThread, pyqtSignal, QObject, QSettings
+    QProgressBar, QComboBox, QGraphicsOpacityEffect, QHBoxLayout, QDialog, QMessageBox, QCheckBox, \
+    QTableView, QHeaderView, QAbstractItemView, QMenu
+from PyQt6.QtCore import QPropertyAnimation, QEasingCurve, Qt, QUrl, QThread, pyqtSignal, QObject, QSettings, \
+    QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QTimer
 from PyQt6.QtGui import QPixmap, QDesktopServices
 import time
 
+try:
+    import blake3  # optional: much faster than sha256 when installed
+except ImportError:
+    blake3 = None
 
-class DownloadCancelledException(Exception):
+
+class DownloadInterrupted(BaseException):
+    """
+    Raised inside yt-dlp to stop a download. It derives from BaseException
+    because yt-dlp's ignoreerrors handling catches Exception and would
+    otherwise just log it and carry on with the next playlist entry.
+    """
+
+
+class DownloadCancelledException(DownloadInterrupted):
+    pass
+
+
+class DownloadPausedException(DownloadInterrupted):
     pass
 
 
+# ---------------------------------------------------------------------------
+# Profiling mode (--profile or WIZVID_PROFILE)
+# ---------------------------------------------------------------------------
+
+# Set in __main__ when profiling is enabled; None means no overhead at all.
+PROFILING_SESSION = None
+
+# From Python 3.12 cProfile hooks sys.monitoring, which is process-wide: one
+# enabled profiler records every thread and a second one cannot start. The
+# pure-Python profiler still uses sys.setprofile, which is per thread.
+PER_THREAD_CPROFILE = sys.version_info < (3, 12)
+
+
+def _profile_root():
+    """Directory next to this script where profiling sessions are written."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+
+
+def profiled(run):
+    """
+    Decorator for worker run() methods: when a profiling session is active
+    the call is profiled with its own profiler in the worker's thread, so
+    QThread workers show up separately in the report.
+    """
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        if PROFILING_SESSION is None:
+            return run(self, *args, **kwargs)
+        return PROFILING_SESSION.profile_call(type(self).__name__, run, self, *args, **kwargs)
+    return wrapper
+
+
+class ProfilingSession:
+    """
+    Collects per-thread profiler stats, GUI event-loop latency and periodic
+    tracemalloc snapshots into out_dir, and writes report.txt on finish().
+    """
+    LAG_INTERVAL_MS = 50
+    STALL_MS = 100
+    SNAPSHOT_INTERVAL_MS = 60000
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        os.makedirs(out_dir, exist_ok=True)
+        self.profiles = collections.defaultdict(list)   # name -> [pstats paths]
+        self.lags_ms = []
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._first_snapshot = None
+        self._last_snapshot = None
+        self._snapshot_count = 0
+        tracemalloc.start(25)
+
+    def profile_call(self, name, func, *args, **kwargs):
+        profiler = cProfile.Profile() if PER_THREAD_CPROFILE else profile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            path = os.path.join(self.out_dir, f'{name}-{next(self._counter)}.pstats')
+            profiler.dump_stats(path)
+            with self._lock:
+                self.profiles[name].append(path)
+
+    def start_gui_monitoring(self, app):
+        """Start the event-loop lag probe and snapshot timer on app's thread."""
+        self._lag_timer = QTimer(app)
+        self._lag_timer.setInterval(self.LAG_INTERVAL_MS)
+        self._last_tick = time.perf_counter()
+        self._lag_timer.timeout.connect(self._on_lag_tick)
+        self._lag_timer.start()
+        self._snapshot_timer = QTimer(app)
+        self._snapshot_timer.setInterval(self.SNAPSHOT_INTERVAL_MS)
+        self._snapshot_timer.timeout.connect(self.take_snapshot)
+        self._snapshot_timer.start()
+        self.take_snapshot()
+
+    def _on_lag_tick(self):
+        now = time.perf_counter()
+        self.lags_ms.append(max(0.0, (now - self._last_tick) * 1000 - self.LAG_INTERVAL_MS))
+        self._last_tick = now
+
+    def take_snapshot(self):
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        self._snapshot_count += 1
+        snapshot.dump(os.path.join(self.out_dir, f'memory-{self._snapshot_count}.tracemalloc'))
+        if self._first_snapshot is None:
+            self._first_snapshot = snapshot
+        self._last_snapshot = snapshot
+
+    def finish(self):
+        """Take a final snapshot and write report.txt. Returns its path."""
+        self.take_snapshot()
+        path = os.path.join(self.out_dir, 'report.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.build_report())
+        tracemalloc.stop()
+        return path
+
+    def build_report(self):
+        out = io.StringIO()
+        with self._lock:
+            profiles = {name: list(paths) for name, paths in self.profiles.items()}
+        all_paths = [p for paths in profiles.values() for p in paths]
+
+        out.write('WizVid profiling report\n=======================\n\n')
+        if not PER_THREAD_CPROFILE:
+            out.write('Profiled per thread with the pure-Python profile module (cProfile is\n'
+                      'process-wide on Python 3.12+); absolute times include its overhead.\n\n')
+        if all_paths:
+            out.write('Hot spots (own time, all threads)\n---------------------------------\n')
+            stats = pstats.Stats(*all_paths, stream=out)
+            rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:15]
+            for (filename, line, func), (_cc, ncalls, tottime, cumtime, _callers) in rows:
+                out.write(f'{tottime:9.3f}s own {cumtime:9.3f}s cum {ncalls:>9} calls  '
+                          f'{func} ({os.path.basename(filename)}:{line})\n')
+            out.write('\n')
+
+        for name, paths in sorted(profiles.items()):
+            out.write(f'{name} ({len(paths)} run(s))\n{"-" * (len(name) + 12)}\n')
+            stats = pstats.Stats(*paths, stream=out)
+            stats.strip_dirs().sort_stats('cumulative').print_stats(15)
+
+        out.write('\nGUI event loop\n--------------\n')
+        if self.lags_ms:
+            lags = sorted(self.lags_ms)
+            stalls = sum(1 for lag in lags if lag >= self.STALL_MS)
+            out.write(f'samples {len(lags)}, mean lag {sum(lags) / len(lags):.1f} ms, '
+                      f'p95 {lags[int(len(lags) * 0.95)]:.1f} ms, max {lags[-1]:.1f} ms, '
+                      f'stalls >= {self.STALL_MS} ms: {stalls}\n')
+        else:
+            out.write('no samples\n')
+
+        out.write('\nMemory (tracemalloc)\n--------------------\n')
+        current, peak = tracemalloc.get_traced_memory()
+        out.write(f'current {current / 1024 ** 2:.1f} MiB, peak {peak / 1024 ** 2:.1f} MiB, '
+                  f'{self._snapshot_count} snapshot(s)\n')
+        if self._first_snapshot is not None and self._last_snapshot is not self._first_snapshot:
+            out.write('Largest growth since the first snapshot:\n')
+            for stat in self._last_snapshot.compare_to(self._first_snapshot, 'lineno')[:10]:
+                out.write(f'  {stat}\n')
+        return out.getvalue()
+
+
 # ---------------------------------------------------------------------------
 # yt-dlp version checker / auto-updater
 # ---------------------------------------------------------------------------
 
+# The index URLs can be pointed at a local stand-in for testing.
+YTDLP_JSON_URL = os.environ.get("WIZVID_PYPI_JSON_URL", "https://pypi.org/pypi/yt-dlp/json")
+YTDLP_PIP_INDEX_URL = os.environ.get("WIZVID_PIP_INDEX_URL")   # None = pip's default index
+UPDATE_CHECK_INTERVAL = 24 * 60 * 60                              # seconds between network checks
+
+
+def fetch_latest_ytdlp_version(cache, url=YTDLP_JSON_URL, interval=UPDATE_CHECK_INTERVAL,
+                               now=None, timeout=10):
+    """
+    Return (latest_version, source) where source is 'cache', 'not-modified'
+    or 'fetched'. `cache` is a dict (checked_at, etag, last_modified,
+    latest_version) that is updated in place. Within `interval` no request
+    is made at all; after that a conditional GET is sent so unchanged
+    metadata only costs a 304 response.
+    """
+    now = time.time() if now is None else now
+    cached_version = cache.get("latest_version")
+    if cached_version and now - cache.get("checked_at", 0) < interval:
+        return cached_version, "cache"
+
+    request = urllib.request.Request(url)
+    if cached_version:
+        if cache.get("etag"):
+            request.add_header("If-None-Match", cache["etag"])
+        if cache.get("last_modified"):
+            request.add_header("If-Modified-Since", cache["last_modified"])
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as resp:
+            data = resp.read()
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304 and cached_version:
+            cache["checked_at"] = now
+            return cached_version, "not-modified"
+        raise
+
+    latest_version = json.loads(data)["info"]["version"]
+    cache.update({
+        "checked_at": now,
+        "etag": etag,
+        "last_modified": last_modified,
+        "latest_version": latest_version,
+    })
+    return latest_version, "fetched"
+
+
+def stage_ytdlp(version, stage_root=None, pip_index_url=YTDLP_PIP_INDEX_URL, timeout=600):
+    """
+    Install yt-dlp==version into its own directory under stage_root and point
+    active.json at it; _activate_staged_ytdlp() picks it up on next start.
+    Returns (ok, message).
+    """
+    stage_root = stage_root or _ytdlp_stage_root()
+    os.makedirs(stage_root, exist_ok=True)
+    target = os.path.join(stage_root, version)
+    tmp_target = target + ".tmp"
+    shutil.rmtree(tmp_target, ignore_errors=True)
+
+    cmd = [sys.executable, "-m", "pip", "install", "--disable-pip-version-check", "--no-deps",
+           "--target", tmp_target, f"yt-dlp=={version}"]
+    if pip_index_url:
+        cmd += ["--index-url", pip_index_url]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        shutil.rmtree(tmp_target, ignore_errors=True)
+        return False, str(exc)
+    if result.returncode != 0:
+        shutil.rmtree(tmp_target, ignore_errors=True)
+        return False, result.stderr.strip() or result.stdout.strip()
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp_target, target)
+    pointer = os.path.join(stage_root, "active.json")
+    with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"version": version}, f)
+    os.replace(pointer + ".tmp", pointer)
+    return True, target
+
+
+def _is_newer_version(candidate, current):
+    return _version_key(candidate) > _version_key(current)
+
+
+def prune_staged_ytdlp(stage_root=None):
+    """
+    Delete staged yt-dlp copies older than the active one. '<version>.tmp'
+    directories are installs in progress (possibly by another instance) and
+    newer directories may be about to become active, so both are kept.
+    """
+    stage_root = stage_root or _ytdlp_stage_root()
+    active = _staged_ytdlp_version(stage_root)
+    if not active or not os.path.isdir(stage_root):
+        return
+    for name in os.listdir(stage_root):
+        path = os.path.join(stage_root, name)
+        if name.endswith(".tmp") or not os.path.isdir(path):
+            continue
+        if _is_newer_version(active, name):
+            shutil.rmtree(path, ignore_errors=True)
+
+
 class YtDlpUpdateWorker(QObject):
-    """Checks PyPI for the latest yt-dlp version and upgrades if needed."""
+    """
+    Checks for a newer yt-dlp (at most once per UPDATE_CHECK_INTERVAL, with
+    a conditional request) and stages it for the next start if needed.
+    """
     status        = pyqtSignal(str)   # status messages for the log
     update_found  = pyqtSignal(str, str)  # (current_version, latest_version)
     up_to_date    = pyqtSignal(str)   # current_version
-    update_done   = pyqtSignal(str)   # new_version after successful update
+    update_done   = pyqtSignal(str)   # new_version staged for the next start
     update_failed = pyqtSignal(str)   # error message
 
+    def __init__(self, json_url=YTDLP_JSON_URL, pip_index_url=YTDLP_PIP_INDEX_URL,
+                 interval=UPDATE_CHECK_INTERVAL, stage_root=None):
+        super().__init__()
+        self.json_url = json_url
+        self.pip_index_url = pip_index_url
+        self.interval = interval
+        self.stage_root = stage_root
+
+    @profiled
     def run(self):
         try:
+            prune_staged_ytdlp(self.stage_root)
             current_version = yt_dlp.version.__version__
-            self.status.emit(f"🔍 Checking yt-dlp version (installed: {current_version}) …")
-
-            with urllib.request.urlopen(
-                "https://pypi.org/pypi/yt-dlp/json", timeout=10
-            ) as resp:
-                data = resp.read()
-
-            latest_version = json.loads(data)["info"]["version"]
+            # QSettings is per-thread; this instance lives in the worker thread.
+            settings = QSettings('MyOrganization', 'WizVid')
+            try:
+                cache = json.loads(settings.value('ytdlp_update_cache', '{}'))
+            except (TypeError, ValueError):
+                cache = {}
+
+            latest_version, source = fetch_latest_ytdlp_version(
+                cache, url=self.json_url, interval=self.interval)
+            settings.setValue('ytdlp_update_cache', json.dumps(cache))
+            if source != "fetched":
+                self.status.emit(f"🔍 yt-dlp {current_version}; latest known {latest_version} ({source})")
+            else:
+                self.status.emit(f"🔍 Checked yt-dlp version (installed: {current_version}, latest: {latest_version})")
 
-            if latest_version == current_version:
+            if not _is_newer_version(latest_version, current_version):
+                # Also covers nightlies and manual upgrades ahead of PyPI: never downgrade.
                 self.status.emit(f"✅ yt-dlp is up to date ({current_version})")
                 self.up_to_date.emit(current_version)
                 return
 
+            if latest_version == _staged_ytdlp_version(self.stage_root):
+                self.status.emit(f"📦 yt-dlp {latest_version} is already staged – restart WizVid to use it.")
+                self.up_to_date.emit(current_version)
+                return
+
             self.status.emit(
                 f"⬆️  New yt-dlp version available: {latest_version} "
-                f"(installed: {current_version}). Updating …"
+                f"(installed: {current_version}). Staging it …"
             )
             self.update_found.emit(current_version, latest_version)
 
-            result = subprocess.run(
-                [sys.executable, "-m", "pip", "install", "--upgrade", "yt-dlp"],
-                capture_output=True, text=True
-            )
-            if result.returncode == 0:
-                self.status.emit(f"✅ yt-dlp updated to {latest_version} successfully!")
+            ok, message = stage_ytdlp(latest_version, stage_root=self.stage_root,
+                                      pip_index_url=self.pip_index_url)
+            if ok:
+                self.status.emit(f"✅ yt-dlp {latest_version} staged in {message}")
                 self.update_done.emit(latest_version)
             else:
-                err = result.stderr.strip() or result.stdout.strip()
-                self.status.emit(f"❌ yt-dlp update failed: {err}")
-                self.update_failed.emit(err)
+                self.status.emit(f"❌ yt-dlp update failed: {message}")
+                self.update_failed.emit(message)
 
         except Exception as exc:
             self.status.emit(f"⚠️  Could not check yt-dlp version: {exc}")
@@ -90,6 +458,16 @@ def _find_system_ffmpeg():
     return shutil.which("ffmpeg")
 
 
+def _find_ffprobe(ffmpeg_path=None):
+    """Return the ffprobe that ships next to ffmpeg_path, or the one on PATH."""
+    bin_name = "ffprobe.exe" if sys.platform == "win32" else "ffprobe"
+    if ffmpeg_path:
+        candidate = os.path.join(os.path.dirname(ffmpeg_path), bin_name)
+        if os.path.isfile(candidate):
+            return candidate
+    return shutil.which("ffprobe")
+
+
 def _get_ffmpeg_download_url():
     """
     Return (url, archive_type) for the latest static ffmpeg build.
@@ -210,11 +588,936 @@ class FfmpegSetupWorker(QObject):
     finished = pyqtSignal(str)   # emits ffmpeg path (empty string = failed)
     status   = pyqtSignal(str)   # status messages
 
+    @profiled
     def run(self):
         path = ensure_ffmpeg(status_callback=self.status.emit)
         self.finished.emit(path or "")
 
 
+# ---------------------------------------------------------------------------
+# URL list ingestion (files, directories, stdin – read lazily)
+# ---------------------------------------------------------------------------
+
+URL_LIST_EXTENSIONS = ('.txt', '.list', '.urls')
+
+
+def iter_url_lines(source):
+    """
+    Lazily yield raw lines from a URL list file, every list file inside a
+    directory (sorted, recursive) or stdin when source is '-'.
+    """
+    if source == '-':
+        yield from sys.stdin
+    elif os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(URL_LIST_EXTENSIONS):
+                    yield from iter_url_lines(os.path.join(root, name))
+    else:
+        with open(source, 'r', encoding='utf-8', errors='replace') as f:
+            yield from f
+
+
+def normalize_url(line):
+    """
+    Return a canonical form of the URL on this line, or None for blank
+    lines, '#' comments and garbage. Scheme and host are lower-cased,
+    fragments dropped and a missing scheme defaults to https.
+    yt-dlp pseudo-URLs such as 'ytsearch:…' are passed through unchanged.
+    """
+    url = line.strip()
+    if not url or url.startswith('#'):
+        return None
+    if '://' not in url:
+        if re.match(r'^[a-z][a-z0-9]*:(?!\d)', url, re.IGNORECASE) and not url.lower().startswith('www.'):
+            return url
+        url = 'https://' + url
+    try:
+        parts = urllib.parse.urlsplit(url)
+        host, port = parts.hostname, parts.port
+    except ValueError:
+        return None
+    if parts.scheme.lower() not in ('http', 'https') or not host:
+        return None
+    netloc = f'[{host}]' if ':' in host else host
+    if port and port != {'http': 80, 'https': 443}[parts.scheme.lower()]:
+        netloc += f':{port}'
+    return urllib.parse.urlunsplit((parts.scheme.lower(), netloc, parts.path or '/', parts.query, ''))
+
+
+class UrlDeduper:
+    """
+    Remembers seen URLs as 64-bit digests instead of full strings, so a
+    100k-line list costs a few MB no matter how long the URLs are.
+    """
+
+    def __init__(self):
+        self._seen = set()
+
+    def add(self, url):
+        """Return True if url is new, False if it was seen before."""
+        key = int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+    def __len__(self):
+        return len(self._seen)
+
+
+def iter_urls(lines, deduper=None):
+    """Normalize and dedupe an iterable of lines, yielding URLs one by one."""
+    deduper = deduper if deduper is not None else UrlDeduper()
+    for line in lines:
+        url = normalize_url(line)
+        if url and deduper.add(url):
+            yield url
+
+
+def iter_url_sources(sources, deduper=None):
+    """iter_urls() over several files / directories / '-' chained together."""
+    lines = (line for source in sources for line in iter_url_lines(source))
+    return iter_urls(lines, deduper)
+
+
+# ---------------------------------------------------------------------------
+# Retry scheduler (per-host backoff + circuit breaker)
+# ---------------------------------------------------------------------------
+
+# Errors that will not go away by trying again – these fail immediately.
+_PERMANENT_ERROR_MARKERS = (
+    'Unsupported URL',
+    'Video unavailable',
+    'Private video',
+    'is not a valid URL',
+    'HTTP Error 404',
+    'HTTP Error 410',
+)
+
+
+def _url_host(url):
+    """Return the lower-cased host of url, used to group jobs for backoff."""
+    try:
+        host = urllib.parse.urlsplit(url.strip()).hostname
+    except ValueError:
+        host = None
+    return (host or '').lower()
+
+
+def _is_permanent_error(message):
+    return any(marker in message for marker in _PERMANENT_ERROR_MARKERS)
+
+
+class RetryJob:
+    """A single URL tracked by the RetryScheduler."""
+
+    def __init__(self, url):
+        self.url = url
+        self.host = _url_host(url)
+        self.attempts = 0
+        self.last_error = ''
+
+
+class HostState:
+    """Backoff / circuit-breaker bookkeeping for one host."""
+
+    def __init__(self):
+        self.consecutive_failures = 0
+        self.not_before = 0.0      # monotonic time before which no job may start
+        self.circuit = 'closed'    # 'closed', 'open' or 'half-open'
+        self.last_error = ''
+
+
+class RetryScheduler:
+    """
+    Hands out download jobs so that a failing host never blocks healthy ones.
+
+    Every failure pushes the host back with exponential backoff plus jitter.
+    After `failure_threshold` consecutive failures the host's circuit opens
+    and its jobs are parked for `cooldown` seconds; the first job after the
+    cooldown is a half-open probe that either closes the circuit again or
+    re-opens it. Jobs that exhaust `max_attempts` (or hit a permanent error)
+    end up in `failed` so they can be retried later.
+
+    An open circuit parks at most `max_parked` jobs; further jobs for that
+    host fail fast, and a failed probe fails everything parked behind it.
+    A long run of URLs for a dead host therefore drains in seconds instead
+    of filling the queue and waiting out cooldown after cooldown.
+    """
+
+    def __init__(self, max_attempts=4, base_delay=2.0, max_delay=60.0,
+                 failure_threshold=3, cooldown=120.0, max_parked=8, clock=time.monotonic, rng=None):
+        self.max_attempts = max_attempts
+        self.max_parked = max_parked
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.failed = []
+        self.succeeded = 0
+        self._queues = collections.OrderedDict()   # host -> deque of RetryJob
+        self._hosts = {}                           # host -> HostState
+
+    def add(self, url):
+        job = RetryJob(url)
+        state = self._hosts.setdefault(job.host, HostState())
+        if state.circuit == 'open' and len(self._queues.get(job.host, ())) >= self.max_parked:
+            self._give_up(job, state)
+            return job
+        self._queues.setdefault(job.host, collections.deque()).append(job)
+        return job
+
+    def pending(self):
+        return sum(len(q) for q in self._queues.values())
+
+    def runnable_pending(self):
+        """Pending jobs whose host circuit is not open."""
+        return sum(len(q) for host, q in self._queues.items() if self._hosts[host].circuit != 'open')
+
+    def host_state(self, host):
+        return self._hosts.get(host)
+
+    def next_job(self):
+        """
+        Return (job, None) for the next runnable job, (None, wait) if every
+        pending host is backing off, or (None, None) once nothing is left.
+        Hosts are served round-robin so one busy host cannot starve others.
+        """
+        if not self._queues:
+            return None, None
+        now = self.clock()
+        earliest = None
+        for host in list(self._queues):
+            state = self._hosts[host]
+            if state.not_before > now:
+                wait = state.not_before - now
+                earliest = wait if earliest is None else min(earliest, wait)
+                continue
+            queue = self._queues.pop(host)
+            job = queue.popleft()
+            if queue:
+                # Re-insert at the end: round-robin between hosts.
+                self._queues[host] = queue
+            if state.circuit == 'open':
+                state.circuit = 'half-open'
+            job.attempts += 1
+            return job, None
+        return None, earliest
+
+    def record_success(self, job):
+        state = self._hosts[job.host]
+        state.consecutive_failures = 0
+        state.not_before = 0.0
+        state.circuit = 'closed'
+        self.succeeded += 1
+
+    def record_failure(self, job, error):
+        """
+        Register a failed attempt. Returns the delay before the job's host
+        will be tried again, or None if the job was given up on.
+        """
+        job.last_error = str(error)
+        if _is_permanent_error(job.last_error):
+            # The host answered fine; the item itself is bad.
+            self.failed.append(job)
+            return None
+
+        state = self._hosts[job.host]
+        state.consecutive_failures += 1
+        state.last_error = job.last_error
+        now = self.clock()
+
+        if state.circuit == 'half-open' or state.consecutive_failures >= self.failure_threshold:
+            # A failed probe means the host is still down: drop everything parked.
+            self._shed(job.host, 0 if state.circuit == 'half-open' else self.max_parked)
+            state.circuit = 'open'
+            delay = self.cooldown
+        else:
+            capped = min(self.max_delay, self.base_delay * (2 ** (state.consecutive_failures - 1)))
+            # "Equal jitter": keep half the backoff, randomise the other half.
+            delay = capped / 2 + self.rng.uniform(0, capped / 2)
+        state.not_before = now + delay
+
+        if job.attempts >= self.max_attempts:
+            self.failed.append(job)
+            return None
+        # Retried jobs go back to the front so they keep their place in line.
+        self._queues.setdefault(job.host, collections.deque()).appendleft(job)
+        return delay
+
+    def _shed(self, host, keep):
+        """Fail the newest parked jobs of host until at most keep are left."""
+        queue = self._queues.get(host)
+        if queue is None:
+            return
+        state = self._hosts[host]
+        while len(queue) > keep:
+            self._give_up(queue.pop(), state)
+        if not queue:
+            del self._queues[host]
+
+    def _give_up(self, job, state):
+        job.last_error = f'{job.host or job.url} is not responding: {state.last_error}'
+        self.failed.append(job)
+
+
+# ---------------------------------------------------------------------------
+# Integrity: streaming checksums + background ffprobe verification
+# ---------------------------------------------------------------------------
+
+_HASH_CHUNK_SIZE = 1 << 20
+CHECKSUM_INDEX_NAME = '.wizvid_checksums.jsonl'
+
+
+def _new_hasher():
+    """Return (algorithm_name, hash_object), preferring BLAKE3 if available."""
+    if blake3 is not None:
+        return 'blake3', blake3.blake3()
+    return 'sha256', hashlib.sha256()
+
+
+def _hash_file(path):
+    algo, hasher = _new_hasher()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return algo, hasher.hexdigest()
+
+
+class StreamingChecksum:
+    """
+    Hashes a file while yt-dlp is still writing it.
+    Every call only reads the bytes appended since the previous call; those
+    were just written and are still in the page cache, so the finished file
+    never has to be read back from disk to be checksummed.
+
+    This only covers files yt-dlp downloads as-is. Outputs written by a
+    postprocessor (merged video, MP3, fan-out extras) are new bytes that
+    the IntegrityVerifier hashes by reading the finished file once.
+    """
+
+    def __init__(self):
+        self.algo, self._hasher = _new_hasher()
+        self.offset = 0
+
+    def feed_from(self, path):
+        try:
+            with open(path, 'rb') as f:
+                size = f.seek(0, os.SEEK_END)
+                if size < self.offset:
+                    # yt-dlp restarted the file from scratch – so do we.
+                    self.algo, self._hasher = _new_hasher()
+                    self.offset = 0
+                f.seek(self.offset)
+                for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+                    self._hasher.update(chunk)
+                    self.offset += len(chunk)
+        except OSError:
+            pass
+
+    def hexdigest(self):
+        return self._hasher.hexdigest()
+
+
+def _ffprobe_check(ffprobe_path, path, expected_duration=None, timeout=120):
+    """
+    Return (ok, problem). A file is bad if ffprobe reports errors, cannot
+    find a duration, or finds one well short of the expected duration.
+    """
+    try:
+        # yt-dlp's Popen, so a cancel terminates the probe with everything else.
+        stdout, stderr, returncode = Popen.run(
+            [ffprobe_path, '-v', 'error', '-show_entries', 'format=duration', '-of', 'json', path],
+            text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout
+        )
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        return False, f'ffprobe failed: {exc}'
+    errors = stderr.strip()
+    if returncode != 0 or errors:
+        return False, (errors.splitlines() or ['ffprobe exited with an error'])[0]
+    try:
+        duration = float(json.loads(stdout)['format']['duration'])
+    except (KeyError, TypeError, ValueError):
+        return False, 'no duration found'
+    if duration <= 0:
+        return False, 'zero duration'
+    if expected_duration and duration < 0.95 * expected_duration:
+        return False, f'truncated ({duration:.0f}s of {expected_duration:.0f}s)'
+    return True, ''
+
+
+class IntegrityVerifier:
+    """
+    Records a checksum for every finished file in a per-folder index
+    (CHECKSUM_INDEX_NAME) and, when ffprobe_path is given, probes each file
+    in a small bounded thread pool so downloads never wait on verification.
+    """
+    WAIT_SLICE = 0.1   # seconds between should_stop() checks in collect()
+
+    def __init__(self, ffprobe_path=None, max_workers=2):
+        self.ffprobe_path = ffprobe_path
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='wizvid-verify')
+        self._futures = []
+        self._index_lock = threading.Lock()
+
+    def submit(self, path, url, checksum=None, expected_duration=None):
+        """checksum is (algo, hexdigest) if it was computed while downloading."""
+        self._futures.append(self._pool.submit(self._process, path, url, checksum, expected_duration))
+
+    def collect(self, wait=True, should_stop=None):
+        """
+        Return [(path, url, problem)] for bad outputs among finished checks.
+        With wait=True this blocks until every check is done, unless
+        should_stop() turns true; checks still running stay queued for
+        the next call.
+        """
+        if wait:
+            pending = set(self._futures)
+            while pending and not (should_stop and should_stop()):
+                _done, pending = concurrent.futures.wait(pending, timeout=self.WAIT_SLICE)
+        done = [f for f in self._futures if f.done()]
+        self._futures = [f for f in self._futures if not f.done()]
+        bad = []
+        for future in done:
+            path, url, ok, problem = future.result()
+            if not ok:
+                bad.append((path, url, problem))
+        return bad
+
+    def pending(self):
+        return len(self._futures)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+    def _process(self, path, url, checksum, expected_duration):
+        try:
+            algo, digest = checksum or _hash_file(path)
+        except OSError as exc:
+            return path, url, False, str(exc)
+        ok, problem = True, ''
+        if self.ffprobe_path:
+            ok, problem = _ffprobe_check(self.ffprobe_path, path, expected_duration)
+        try:
+            self._append_index(path, algo, digest, ok if self.ffprobe_path else None)
+        except OSError as exc:
+            # The file vanished after hashing, or the folder is read-only –
+            # report it against this file rather than failing the batch.
+            return path, url, False, f'could not record checksum: {exc}'
+        return path, url, ok, problem
+
+    def _append_index(self, path, algo, digest, verified):
+        entry = {
+            'file': os.path.basename(path),
+            'size': os.path.getsize(path),
+            'algo': algo,
+            'digest': digest,
+            'verified': verified,
+            'time': int(time.time()),
+        }
+        index_path = os.path.join(os.path.dirname(os.path.abspath(path)), CHECKSUM_INDEX_NAME)
+        with self._index_lock, open(index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+# ---------------------------------------------------------------------------
+# Multi-output fan-out (one download, several formats, one ffmpeg pass)
+# ---------------------------------------------------------------------------
+
+# Keyed by the names used in the format dropdown.
+FANOUT_TARGETS = {
+    'Best Video': {'kind': 'video', 'height': None, 'suffix': ' [best]'},
+    'MP4 720p':   {'kind': 'video', 'height': 720, 'suffix': ' [720p]'},
+    'MP4 1080p':  {'kind': 'video', 'height': 1080, 'suffix': ' [1080p]'},
+    'MP4 1440p':  {'kind': 'video', 'height': 1440, 'suffix': ' [1440p]'},
+    'MP4 4K':     {'kind': 'video', 'height': 2160, 'suffix': ' [4K]'},
+    'Best Audio': {'kind': 'audio', 'bitrate': '192k', 'suffix': ' [192k]'},
+    'MP3':        {'kind': 'audio', 'bitrate': '320k', 'suffix': ''},
+}
+
+
+def _fanout_primary_target(targets):
+    """The video target the downloaded file already satisfies, or None if audio only."""
+    videos = [t for t in targets if FANOUT_TARGETS[t]['kind'] == 'video']
+    if not videos:
+        return None
+    return max(videos, key=lambda t: FANOUT_TARGETS[t]['height'] or float('inf'))
+
+
+def fanout_download_options(targets):
+    """yt-dlp format options that fetch, once, the best source every target needs."""
+    primary = _fanout_primary_target(targets)
+    if primary is None:
+        return {'format': 'bestaudio/best'}
+    height = FANOUT_TARGETS[primary]['height']
+    cap = f'[height<={height}]' if height else ''
+    return {
+        'format': f'bestvideo[ext=mp4]{cap}+bestaudio[ext=m4a]/best[ext=mp4]/best',
+        'merge_output_format': 'mp4',
+    }
+
+
+def _fanout_metadata_args(info):
+    """-metadata options from the info dict, as FFmpegMetadata would write them."""
+    tags = {
+        'title': info.get('track') or info.get('title'),
+        'artist': info.get('artist') or info.get('creator') or info.get('uploader'),
+        'album': info.get('album'),
+        'date': info.get('upload_date'),
+        'purl': info.get('webpage_url'),
+        'comment': info.get('webpage_url'),
+    }
+    args = []
+    for name, value in tags.items():
+        if value:
+            args += ['-metadata', f"{name}={str(value).replace(chr(0), '')}"]
+    return args
+
+
+def build_fanout_command(ffmpeg_path, sources, source_height, outputs, video_input=0, audio_input=0,
+                         metadata=(), aac_fixup=False):
+    """
+    Build a single ffmpeg command writing every (target_spec, path) in
+    outputs from the given inputs (one muxed file, or the separate video
+    and audio streams of an unmerged download). Streams are copied unless
+    a target needs a smaller picture or MP3 audio; ffmpeg decodes each
+    input stream once and feeds every output that needs it. As in
+    FFmpegMergerPP, copied ADTS AAC from HLS gets the aac_adtstoasc
+    filter (aac_fixup) and MP4 outputs are written with +faststart.
+    """
+    cmd = [ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-y']
+    for source in sources:
+        cmd += ['-i', source]
+    video, audio = f'{video_input}:v:0', f'{audio_input}:a:0'
+    for spec, path in outputs:
+        cmd += ['-map_metadata', '0'] + list(metadata)
+        if spec['kind'] == 'audio':
+            cmd += ['-map', audio, '-vn', '-c:a', 'libmp3lame', '-b:a', spec['bitrate'], '-write_id3v1', '1']
+        elif spec['height'] and source_height and source_height > spec['height']:
+            cmd += ['-map', video, '-map', audio + '?', '-vf', f"scale=-2:{spec['height']}",
+                    '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20', '-c:a', 'copy']
+        else:
+            cmd += ['-map', video, '-map', audio + '?', '-c', 'copy']
+        if aac_fixup and spec['kind'] != 'audio':
+            cmd += ['-bsf:a', 'aac_adtstoasc']
+        if os.path.splitext(path)[1].lower() in ('.mp4', '.m4a', '.mov'):
+            cmd += ['-movflags', '+faststart']
+        cmd.append(path)
+    return cmd
+
+
+class FanOutPostProcessor(PostProcessor):
+    """
+    Writes every requested target in one ffmpeg invocation. For a
+    bestvideo+bestaudio download it takes the place of yt-dlp's merger
+    (see attach) and reads the two raw streams directly, writing the merged
+    primary file as one of its outputs; otherwise it reads the downloaded
+    file. The paths written besides info['filepath'] are kept in extra_outputs.
+    """
+
+    def __init__(self, downloader, targets, ffmpeg_path=None):
+        super().__init__(downloader)
+        self.targets = list(dict.fromkeys(targets))
+        self.ffmpeg_path = ffmpeg_path or 'ffmpeg'
+        self.extra_outputs = []
+
+    def attach(self, ydl):
+        """
+        Hook into ydl.post_process so this runs in place of FFmpegMergerPP
+        (or after the other per-download postprocessors if nothing is merged).
+        """
+        original_post_process = ydl.post_process
+
+        def post_process(filename, info, *args, **kwargs):
+            pps = info.setdefault('__postprocessors', [])
+            mergers = [i for i, pp in enumerate(pps) if isinstance(pp, FFmpegMergerPP)]
+            if mergers:
+                pps[mergers[0]] = self
+            else:
+                pps.append(self)
+            return original_post_process(filename, info, *args, **kwargs)
+
+        ydl.post_process = post_process
+
+    def run(self, info):
+        target_path = info['filepath']
+        base = os.path.splitext(target_path)[0]
+        primary = _fanout_primary_target(self.targets)
+        merge_inputs = info.get('__files_to_merge')
+        outputs = []
+        if merge_inputs:
+            # The merged file is one more output of the same pass.
+            outputs.append((FANOUT_TARGETS[primary], target_path))
+        for name in self.targets:
+            if name == primary:
+                continue
+            spec = FANOUT_TARGETS[name]
+            path = base + spec['suffix'] + ('.mp3' if spec['kind'] == 'audio' else '.mp4')
+            if path == target_path:
+                path = base + f" [{name.replace(' ', '')}]" + os.path.splitext(path)[1]
+            outputs.append((spec, path))
+        sources, video_input, audio_input, aac_fixup = [target_path], 0, 0, False
+        if merge_inputs:
+            sources = list(merge_inputs)
+            formats = info.get('requested_formats') or []
+            video_input = next((i for i, f in enumerate(formats) if f.get('vcodec') != 'none'), 0)
+            audio_input = next((i for i, f in enumerate(formats) if f.get('acodec') != 'none'), 0)
+            if audio_input < len(formats):
+                audio_format = formats[audio_input]
+                aac_fixup = ((audio_format.get('protocol') or '').startswith('m3u8')
+                             and (audio_format.get('acodec') or '').startswith(('mp4a', 'aac')))
+        if outputs:
+            self.to_screen(f'Writing {len(outputs)} output(s) in one ffmpeg pass')
+            # Like the merger, write to .temp files and rename only after
+            # ffmpeg succeeded: a cut-short file at the final name would be
+            # taken for a finished download next time.
+            temp_outputs = [(spec, prepend_extension(path, 'temp')) for spec, path in outputs]
+            cmd = build_fanout_command(self.ffmpeg_path, sources, info.get('height'), temp_outputs,
+                                       video_input, audio_input, _fanout_metadata_args(info), aac_fixup)
+            # yt-dlp's Popen, so pause/cancel can reach this ffmpeg too.
+            _stdout, stderr, returncode = Popen.run(
+                cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            if returncode != 0:
+                for _spec, temp_path in temp_outputs:
+                    try:
+                        os.remove(temp_path)
+                    except OSError:
+                        pass
+                raise PostProcessingError(f'ffmpeg fan-out failed: {stderr.strip()}')
+            for (_spec, path), (_spec, temp_path) in zip(outputs, temp_outputs):
+                os.replace(temp_path, path)
+        paths = [path for _spec, path in outputs if path != target_path]
+        if primary is None and paths:
+            # Audio-only job: the downloaded stream itself was not asked for.
+            os.remove(target_path)
+            info['filepath'] = paths.pop(0)
+        self.extra_outputs.extend(paths)
+        # Like the merger: the raw streams are deleted unless keepvideo is set.
+        return list(merge_inputs or []), info
+
+
+# ---------------------------------------------------------------------------
+# Stream cache (raw downloaded streams, reused across jobs and formats)
+# ---------------------------------------------------------------------------
+
+STREAM_CACHE_MAX_BYTES = 5 * 1024 ** 3
+
+
+def _stream_cache_dir():
+    """Directory next to this script where raw streams are cached."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "stream_cache")
+
+
+def _link_or_copy(src, dst):
+    """Hardlink src to dst (no bytes moved); copy when linking is impossible."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class StreamCache:
+    """
+    Size-capped store of raw streams addressed by (extractor, video id,
+    format_id), evicting the least recently used entries first. Streams
+    go in and out as hardlinks: yt-dlp deleting its intermediate files
+    after merging doesn't touch the cached copy, and ffmpeg always writes
+    new files rather than modifying its inputs. A stream that is itself
+    the final output is detach()ed so editing it can't change the cache.
+    """
+    INDEX_NAME = 'index.json'
+
+    def __init__(self, root=None, max_bytes=STREAM_CACHE_MAX_BYTES):
+        self.root = root or _stream_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        self._entries = self._load_index()   # key -> {'file', 'size', 'used'}
+
+    @staticmethod
+    def make_key(info):
+        """Cache key for a single-format info dict, or None if it can't be cached."""
+        parts = (info.get('extractor_key') or info.get('extractor'), info.get('id'), info.get('format_id'))
+        if not all(parts) or info.get('is_live'):
+            return None
+        return '/'.join(str(part) for part in parts)
+
+    def fetch(self, key, dest):
+        """Hardlink the cached stream for key to dest. Returns True on a hit."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or os.path.exists(dest):
+                return False
+            path = os.path.join(self.root, entry['file'])
+            if not os.path.isfile(path):
+                del self._entries[key]
+                self._save_index()
+                return False
+            os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+            _link_or_copy(path, dest)
+            entry['used'] = time.time()
+            self.hits += 1
+            self.bytes_saved += entry['size']
+            self._save_index()
+            return True
+
+    def store(self, key, src):
+        """Add the finished stream at src under key (or refresh it if known)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and os.path.isfile(os.path.join(self.root, entry['file'])):
+                entry['used'] = time.time()
+                self._save_index()
+                return
+            digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+            ext = os.path.splitext(src)[1]
+            rel_path = os.path.join(digest[:2], digest + ext)
+            path = os.path.join(self.root, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            _link_or_copy(src, tmp_path)
+            os.replace(tmp_path, path)
+            self._entries[key] = {'file': rel_path, 'size': os.path.getsize(path), 'used': time.time()}
+            self._evict()
+            self._save_index()
+
+    def evict(self, key):
+        """Drop key from the cache, e.g. because the stream turned out to be bad."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            try:
+                os.remove(os.path.join(self.root, entry['file']))
+            except OSError:
+                pass
+            self._save_index()
+            return True
+
+    @staticmethod
+    def detach(path):
+        """Give path its own copy of its bytes if it is hardlinked elsewhere (the cache)."""
+        try:
+            if os.stat(path).st_nlink < 2:
+                return False
+        except OSError:
+            return False
+        tmp_path = path + '.detach'
+        shutil.copy2(path, tmp_path)
+        os.replace(tmp_path, path)
+        return True
+
+    def total_size(self):
+        return sum(entry['size'] for entry in self._entries.values())
+
+    def _evict(self):
+        total = self.total_size()
+        for key, entry in sorted(self._entries.items(), key=lambda item: item[1]['used']):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.root, entry['file']))
+            except OSError:
+                pass
+            total -= entry['size']
+            del self._entries[key]
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.root, self.INDEX_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        index_path = os.path.join(self.root, self.INDEX_NAME)
+        with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f)
+        os.replace(index_path + '.tmp', index_path)
+
+
+class StreamCachePrefetchPP(PostProcessor):
+    """
+    before_dl step: hardlinks cached streams to the paths yt-dlp is about to
+    download to. yt-dlp then finds them already complete and skips the
+    network; a path that doesn't match yt-dlp's naming is just a cache miss.
+    """
+
+    def __init__(self, downloader, cache):
+        super().__init__(downloader)
+        self.cache = cache
+
+    def run(self, info):
+        if os.path.exists(self._downloader.prepare_filename(info)):
+            return [], info
+        temp_filename = self._downloader.prepare_filename(info, 'temp')
+        root = os.path.splitext(temp_filename)[0]
+        requested = info.get('requested_formats')
+        for fmt in requested or [info]:
+            key = StreamCache.make_key(dict(info, **fmt))
+            if key is None:
+                continue
+            # Same naming yt-dlp uses for the parts of a merged download.
+            dest = f"{root}.f{fmt['format_id']}.{fmt['ext']}" if requested else temp_filename
+            if self.cache.fetch(key, dest):
+                self.to_screen(f"Reusing cached stream {fmt['format_id']} – nothing to download")
+        return [], info
+
+
+# ---------------------------------------------------------------------------
+# Download options
+# ---------------------------------------------------------------------------
+
+def build_download_options(download_path, selected_format, ffmpeg_path=None):
+    """yt-dlp options for one of the format dropdown entries."""
+    options = {
+        'outtmpl': os.path.join(download_path, '%(title)s.%(ext)s'),
+        'noprogress': True,
+        'external_downloader_args': ['-loglevel', 'error', '-y']
+    }
+    # Supply ffmpeg location to yt-dlp if we resolved it
+    if ffmpeg_path and os.path.isfile(ffmpeg_path):
+        options['ffmpeg_location'] = os.path.dirname(ffmpeg_path)
+    if selected_format == 'Best Video':
+        options['format'] = 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'
+        options['merge_output_format'] = 'mp4'
+    elif selected_format == 'Best Audio':
+        options['format'] = 'bestaudio/best'
+        options['extract_audio'] = True
+        options['audio_format'] = 'mp3'
+        options['postprocessors'] = [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': '192'
+        }, {'key': 'FFmpegMetadata'}]
+    elif selected_format == 'MP3':
+        options['format'] = 'bestaudio/best'
+        options['extract_audio'] = True
+        options['audio_format'] = 'mp3'
+        options['postprocessors'] = [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': '320'
+        }, {'key': 'FFmpegMetadata'}]
+    elif 'MP4' in selected_format:
+        resolution = selected_format.split(' ')[1][:-1]
+        options['format'] = f'bestvideo[ext=mp4][height<={resolution}]+bestaudio[ext=m4a]/best[ext=mp4]/best'
+        options['merge_output_format'] = 'mp4'
+    return options
+
+
+def _playlist_entry_urls(info):
+    """
+    URLs of the entries of a flat-extracted playlist, or None if any entry
+    has no usable http(s) URL (then the playlist is downloaded as one job).
+    """
+    urls = []
+    for entry in info.get('entries') or []:
+        url = (entry or {}).get('url') or (entry or {}).get('webpage_url')
+        if not url or not url.startswith(('http://', 'https://')):
+            return None
+        urls.append(url)
+    return urls or None
+
+
+def _response_socket(response, max_depth=6):
+    """
+    Find the socket under a yt-dlp response, whichever request handler made
+    it (urllib: fp -> HTTPResponse -> fp -> raw -> _sock; requests/urllib3:
+    fp -> raw -> _fp -> ... or _connection.sock). Returns None if not found.
+    """
+    level, seen = [response], set()
+    for _ in range(max_depth):
+        next_level = []
+        for obj in level:
+            if obj is None or id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            if isinstance(obj, socket.socket):
+                return obj
+            for attr in ('fp', '_fp', 'raw', '_sock', 'sock', '_connection', 'connection'):
+                try:
+                    next_level.append(getattr(obj, attr, None))
+                except Exception:
+                    continue
+        level = next_level
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Child process tracking (so pause/cancel can reach ffmpeg)
+# ---------------------------------------------------------------------------
+
+_LIVE_CHILDREN = weakref.WeakSet()
+_LIVE_CHILDREN_LOCK = threading.Lock()
+
+
+def _track_ytdlp_children():
+    """
+    Register every process started through yt_dlp.utils.Popen (merger,
+    audio extraction, external downloaders, our fan-out) so a pause can
+    suspend it and a cancel can terminate it instead of waiting it out.
+    """
+    popen_cls = yt_dlp.utils.Popen
+    original_init = popen_cls.__init__
+    if getattr(original_init, '_wizvid_tracked', False):
+        return
+
+    @functools.wraps(original_init)
+    def __init__(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        with _LIVE_CHILDREN_LOCK:
+            _LIVE_CHILDREN.add(self)
+
+    __init__._wizvid_tracked = True
+    popen_cls.__init__ = __init__
+
+
+def _live_children():
+    with _LIVE_CHILDREN_LOCK:
+        return [proc for proc in _LIVE_CHILDREN if proc.poll() is None]
+
+
+def _signal_children(signum):
+    for proc in _live_children():
+        try:
+            proc.send_signal(signum)
+        except OSError:
+            pass
+
+
+def _terminate_children(grace=0.3):
+    """SIGTERM every live child, then SIGKILL whatever is left after grace seconds."""
+    children = _live_children()
+    if not children:
+        return
+    if hasattr(signal, 'SIGCONT'):
+        _signal_children(signal.SIGCONT)   # a stopped process would sit on SIGTERM
+    for proc in children:
+        try:
+            proc.terminate()
+        except OSError:
+            pass
+
+    def _reap():
+        deadline = time.monotonic() + grace
+        for proc in children:
+            try:
+                proc.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    threading.Thread(target=_reap, daemon=True).start()
+
+
 # ---------------------------------------------------------------------------
 # Download worker
 # ---------------------------------------------------------------------------
@@ -227,24 +1530,67 @@ class DownloadWorker(QObject):
     paused_signal = pyqtSignal()
     resumed_signal = pyqtSignal()
     cancelled_signal = pyqtSignal()
-
-    def __init__(self, urls, options):
+    retry_signal = pyqtSignal(str)           # retry / circuit-breaker messages
+    failed_items_signal = pyqtSignal(list)   # URLs that could not be downloaded
+    integrity_signal = pyqtSignal(str)       # checksum / verification messages
+    job_state_signal = pyqtSignal(str, str)  # (job key, status) for the queue view
+    cache_signal = pyqtSignal(str)           # stream cache summary
+    control_signal = pyqtSignal(str)         # pause / cancel latency reports
+
+    # How many runnable jobs to keep queued; the URL source is only read
+    # further when the scheduler drops below this (backpressure).
+    max_pending = 64
+
+    def __init__(self, urls, options, scheduler=None, verifier=None, fanout_targets=None, ffmpeg_path=None,
+                 stream_cache=None):
         super().__init__()
-        self.urls = urls
+        self.stream_cache = stream_cache
+        self.fanout_targets = fanout_targets
+        self.ffmpeg_path = ffmpeg_path
+        self.fanout_pp = None
+        self._url_iter = iter(urls)   # list or lazy generator (see iter_urls)
+        self._source_exhausted = False
         self.options = options
+        self.scheduler = scheduler or RetryScheduler()
+        self.verifier = verifier or IntegrityVerifier()
+        self._checksums = {}         # file being written -> StreamingChecksum
+        self._finished_checksums = {}  # finished file -> (algo, hexdigest)
+        self._current_job_url = None
+        self._last_error = None
+        self._failed_reported = 0   # scheduler.failed entries already shown as 'Failed'
+        self._current_entry = (None, None)  # (row key, duration) of the item being processed
+        self._redownloaded = set()
+        self._cache_keys = {}        # row key -> stream cache keys the item used
+        self._cached_paths = set()   # downloaded files that are hardlinked into the cache
         self.is_playlist = False
         self._is_paused = False
         self._is_cancelled = False
+        self._state_changed = threading.Event()   # set by pause/resume/cancel
+        self._interrupt_requested_at = None
+        self._stage = 'starting'
+        self._inflight = weakref.WeakSet()        # open HTTP responses
+        self._inflight_lock = threading.Lock()
+        self._job_outputs = set()   # files the item in progress may leave behind
         self.ydl_instance = None
+        _track_ytdlp_children()
 
+    @profiled
     def run(self):
         try:
             self.options['progress_hooks'] = [self.progress_hook]
+            self.options['post_hooks'] = [self.post_hook]
+            self.options['postprocessor_hooks'] = [self.postprocessor_hook]
+            first_url = next(self._url_iter, None)
+            if first_url is None:
+                self.error_signal.emit('No valid URLs found.')
+                return
             temp_options = self.options.copy()
             temp_options['quiet'] = True
             temp_options['extract_flat'] = True
+            first_jobs = [first_url]
             with yt_dlp.YoutubeDL(temp_options) as ydl_info:
-                info = ydl_info.extract_info(self.urls[0], download=False)
+                self._install_interrupt_points(ydl_info)
+                info = self._probe(ydl_info, first_url)
                 if info and info.get('_type') == 'playlist' and ('entries' in info):
                     playlist_title = info.get('title')
                     if playlist_title:
@@ -257,37 +1603,841 @@ class DownloadWorker(QObject):
                             original_download_dir = '.'
                         self.options['outtmpl'] = os.path.join(original_download_dir, safe_playlist_name,
                                                                '%(title)s.%(ext)s')
-                        self.options['yes_playlist'] = True
-                        self.options['ignoreerrors'] = True
+                        entry_urls = _playlist_entry_urls(info)
+                        if entry_urls:
+                            # One job per entry: each gets its own retries, backoff and
+                            # failed-list entry instead of vanishing into ignoreerrors.
+                            first_jobs = entry_urls
+                            self.options['noplaylist'] = True
+                        else:
+                            self.options['yes_playlist'] = True
+                            self.options['ignoreerrors'] = True
             self.ydl_instance = yt_dlp.YoutubeDL(self.options)
+            self._install_interrupt_points(self.ydl_instance)
+            self._capture_errors(self.ydl_instance)
+            if self.stream_cache is not None:
+                cache_hits, cache_saved = self.stream_cache.hits, self.stream_cache.bytes_saved
+                self.ydl_instance.add_post_processor(
+                    StreamCachePrefetchPP(self.ydl_instance, self.stream_cache), when='before_dl')
+            if self.fanout_targets:
+                self.fanout_pp = FanOutPostProcessor(self.ydl_instance, self.fanout_targets, self.ffmpeg_path)
+                self.fanout_pp.attach(self.ydl_instance)
             with self.ydl_instance as ydl:
-                ydl.download(self.urls)
-            self.finished_signal.emit(self.is_playlist)
+                self._run_scheduled(ydl, first_jobs)
+            if self.stream_cache is not None and self.stream_cache.hits > cache_hits:
+                self.cache_signal.emit(
+                    f"♻️ Reused {self.stream_cache.hits - cache_hits} cached stream(s), "
+                    f"{_format_bytes(self.stream_cache.bytes_saved - cache_saved)} not downloaded again.")
+            failed = self.scheduler.failed
+            if failed:
+                self.failed_items_signal.emit([job.url for job in failed])
+            if failed and not self.scheduler.succeeded:
+                self.error_signal.emit(failed[-1].last_error)
+            else:
+                self.finished_signal.emit(self.is_playlist)
         except DownloadCancelledException:
+            removed = self._cleanup_partial_outputs()
+            self._report_interrupt('Cancelled', f', {removed} temporary file(s) removed')
             self.cancelled_signal.emit()
         except Exception as e:
             self.error_signal.emit(str(e))
+        finally:
+            self.verifier.shutdown()
+
+    def _run_scheduled(self, ydl, first_jobs):
+        """Download every URL through the RetryScheduler, one job at a time."""
+        self._url_iter = itertools.chain(first_jobs, self._url_iter)
+        while True:
+            if self._is_cancelled:
+                raise DownloadCancelledException('Download cancelled by user.')
+            self._refill()
+            self._requeue_bad_outputs(self.verifier.collect(wait=False))
+            job, wait = self.scheduler.next_job()
+            if job is None:
+                if wait is not None:
+                    self._interruptible_sleep(wait)
+                    continue
+                # Queue drained: wait for outstanding checks, which may requeue work.
+                self._stage = 'verifying'
+                bad = self.verifier.collect(wait=True, should_stop=self._interrupt_pending)
+                if self._is_cancelled:
+                    raise DownloadCancelledException('Download cancelled by user.')
+                if self._is_paused:
+                    self._report_interrupt('Paused')
+                    self._wait_while_paused()
+                if self._requeue_bad_outputs(bad) or self.verifier.pending():
+                    continue
+                return
+            self._current_job_url = job.url
+            self._current_entry = (job.url, None)
+            self._job_outputs.clear()
+            self.job_state_signal.emit(job.url, 'Starting')
+            try:
+                self._download_job(ydl, job)
+            except DownloadCancelledException:
+                raise
+            except Exception as e:
+                if self._is_cancelled:
+                    raise DownloadCancelledException('Download cancelled by user.')
+                delay = self.scheduler.record_failure(job, e)
+                state = self.scheduler.host_state(job.host)
+                if delay is not None:
+                    self.job_state_signal.emit(job.url, 'Retrying')
+                if delay is None:
+                    self.retry_signal.emit(f"❌ Giving up on {job.url}: {job.last_error}")
+                elif state.circuit == 'open':
+                    self.retry_signal.emit(
+                        f"🛑 {job.host or job.url} keeps failing – pausing it for {delay:.0f}s, "
+                        f"other hosts continue.")
+                else:
+                    self.retry_signal.emit(
+                        f"🔁 Attempt {job.attempts} failed for {job.url}, retrying in {delay:.1f}s …")
+                self._report_given_up(job)
+            else:
+                self._job_outputs.clear()
+                self.scheduler.record_success(job)
+                self.job_state_signal.emit(job.url, 'Done')
 
-    def progress_hook(self, d):
+    def _download_job(self, ydl, job):
+        """
+        Run one job. A pause aborts the transfer (releasing the connection);
+        after resume the same job runs again and yt-dlp continues the .part
+        file with an HTTP Range request.
+        """
+        while True:
+            self._stage = 'extracting'
+            self._last_error = None
+            try:
+                retcode = ydl.download([job.url])
+            except DownloadPausedException:
+                retcode = None
+            except Exception:
+                if not self._interrupt_pending():
+                    raise
+                retcode = None
+            if self._is_cancelled:
+                # e.g. ffmpeg was terminated and yt-dlp reported it as an error
+                raise DownloadCancelledException('Download cancelled by user.')
+            if self._is_paused and retcode != 0:
+                self._report_interrupt('Paused', ' – connection released')
+                self.job_state_signal.emit(job.url, 'Paused')
+                self._wait_while_paused()
+                self.job_state_signal.emit(job.url, 'Starting')
+                continue
+            if retcode:
+                # With ignoreerrors yt-dlp only reports failures and returns 1.
+                raise DownloadError(self._last_error or f'yt-dlp reported errors for {job.url}')
+            return
+
+    def _capture_errors(self, ydl):
+        """Remember the last error yt-dlp reported, including ones ignoreerrors swallows."""
+        original_report_error = ydl.report_error
+
+        def report_error(message, *args, **kwargs):
+            self._last_error = str(message)
+            return original_report_error(message, *args, **kwargs)
+
+        ydl.report_error = report_error
+
+    def _probe(self, ydl, url):
+        """Flat extraction of the first URL, restarted if a pause interrupts it."""
+        while True:
+            self._stage = 'extracting'
+            try:
+                return ydl.extract_info(url, download=False)
+            except DownloadPausedException:
+                pass
+            except Exception:
+                if not self._interrupt_pending():
+                    raise
+                if self._is_cancelled:
+                    raise DownloadCancelledException('Download cancelled by user.')
+            self._report_interrupt('Paused', ' – connection released')
+            self._wait_while_paused()
+
+    def _interrupt_pending(self):
+        """
+        True if pause/cancel was requested. Closing a connection under yt-dlp
+        can surface as an ordinary network error rather than our exception.
+        """
+        return self._is_paused or self._is_cancelled
+
+    def _wait_while_paused(self):
+        while self._is_paused and not self._is_cancelled:
+            self._state_changed.wait()
+            self._state_changed.clear()
+        if self._is_cancelled:
+            raise DownloadCancelledException('Download cancelled by user.')
+
+    def _install_interrupt_points(self, ydl):
+        """
+        Route every HTTP request yt-dlp makes (extraction, downloads,
+        fragments) through a check for pause/cancel, and remember the open
+        responses so pause()/cancel() can close them from the GUI thread.
+        """
+        original_urlopen = ydl.urlopen
+
+        def urlopen(req, *args, **kwargs):
+            self._check_interrupt()
+            response = original_urlopen(req, *args, **kwargs)
+            with self._inflight_lock:
+                self._inflight.add(response)
+            self._check_interrupt()
+            return response
+
+        ydl.urlopen = urlopen
+
+    def _check_interrupt(self):
         if self._is_cancelled:
             raise DownloadCancelledException('Download cancelled by user.')
         if self._is_paused:
-            while self._is_paused:
-                time.sleep(0.1)
+            raise DownloadPausedException('Download paused by user.')
+
+    def _abort_inflight(self):
+        with self._inflight_lock:
+            responses = list(self._inflight)
+            self._inflight.clear()
+        for response in responses:
+            # close() alone doesn't wake a recv() blocked on a stalled socket
+            # (that waits for socket_timeout); shutting the socket down does.
+            sock = _response_socket(response)
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def _report_interrupt(self, what, detail=''):
+        if self._interrupt_requested_at is None:
+            return
+        latency_ms = (time.perf_counter() - self._interrupt_requested_at) * 1000
+        self._interrupt_requested_at = None
+        self.control_signal.emit(f'⏱️ {what} after {latency_ms:.0f} ms during {self._stage}{detail}.')
+
+    def _note_job_files(self, info, d=None):
+        """
+        Remember the files yt-dlp writes for the item in progress, so a
+        cancel can remove exactly those: .part/.ytdl files (and fragments
+        named after the .part file), the per-format streams of a merge and
+        the .temp file postprocessors write before renaming. The final
+        file is never included; once it exists the item is done.
+        """
+        filename = info.get('_filename') or info.get('filepath')
+        if filename:
+            self._job_outputs.add(prepend_extension(filename, 'temp'))
+            stem = os.path.splitext(filename)[0]
+            for fmt in info.get('requested_formats') or []:
+                if fmt.get('format_id') and fmt.get('ext'):
+                    stream = f"{stem}.f{fmt['format_id']}.{fmt['ext']}"
+                    self._job_outputs.update((stream, stream + '.part', stream + '.ytdl'))
+        if d is not None:
+            if d.get('tmpfilename'):
+                self._job_outputs.add(d['tmpfilename'])
+            if d.get('filename'):
+                self._job_outputs.update((d['filename'] + '.part', d['filename'] + '.ytdl'))
+
+    def _cleanup_partial_outputs(self):
+        """
+        Delete the files the interrupted item was writing (see
+        _note_job_files), plus fan-out outputs not yet handed to post_hook.
+        Other files in the folder are never touched, however similar
+        their names.
+        """
+        paths = set(self._job_outputs)
+        if self.fanout_pp is not None:
+            for extra in self.fanout_pp.extra_outputs:
+                paths.update((extra, prepend_extension(extra, 'temp')))
+            self.fanout_pp.extra_outputs.clear()
+        # Fragmented downloads write '<name>.part-Frag<N>' (and its own .part).
+        for part in [p for p in paths if p.endswith('.part')]:
+            directory, base = os.path.split(part)
+            fragment = re.compile(re.escape(base) + r'-Frag\d+(\.part)?$')
+            try:
+                names = os.listdir(directory or '.')
+            except OSError:
+                continue
+            paths.update(os.path.join(directory, name) for name in names if fragment.match(name))
+        removed = 0
+        for path in paths:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        self._job_outputs.clear()
+        return removed
+
+    def _add_job(self, url):
+        self.job_state_signal.emit(url, 'Queued')
+        self.scheduler.add(url)
+
+    def _report_given_up(self, current=None):
+        """Mark jobs the scheduler failed since the last call; summarise fast-failed ones."""
+        new = self.scheduler.failed[self._failed_reported:]
+        self._failed_reported = len(self.scheduler.failed)
+        for job in new:
+            self.job_state_signal.emit(job.url, 'Failed')
+        shed = [job for job in new if job is not current]
+        if shed:
+            self.retry_signal.emit(
+                f"🛑 {len(shed)} queued item(s) moved to the failed list – "
+                f"{shed[-1].host or shed[-1].url} is not responding.")
+
+    def _refill(self):
+        """Top the scheduler up from the URL source without reading it all."""
+        if self._source_exhausted:
+            return
+        # Jobs of hosts with an open circuit don't count, so a dead host can't
+        # starve the rest of the list (the scheduler parks only a few of them
+        # and fails the rest fast); the hard cap keeps memory bounded anyway.
+        hard_cap = self.max_pending * 16
+        try:
+            while (self.scheduler.runnable_pending() < self.max_pending
+                   and self.scheduler.pending() < hard_cap):
+                url = next(self._url_iter, None)
+                if url is None:
+                    self._source_exhausted = True
+                    return
+                self._add_job(url)
+        finally:
+            self._report_given_up()
+
+    def _requeue_bad_outputs(self, bad):
+        """Delete outputs that failed verification and queue them once more."""
+        requeued = False
+        for path, url, problem in bad:
+            name = os.path.basename(path)
+            if url in self._redownloaded:
+                self.integrity_signal.emit(f"❌ {name} failed verification again ({problem}).")
+                continue
+            self.integrity_signal.emit(f"⚠️ {name} failed verification ({problem}) – downloading it again …")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self._redownloaded.add(url)
+            if self.stream_cache is not None:
+                # Otherwise the "re-download" would just relink the same bad streams.
+                for key in self._cache_keys.pop(url, ()):
+                    self.stream_cache.evict(key)
+            self._add_job(url)
+            requeued = True
+        return requeued
+
+    def post_hook(self, filepath):
+        """Called by yt-dlp with the final path once all postprocessors ran."""
+        checksum = self._finished_checksums.get(filepath)
+        # Intermediate streams (before merging / audio extraction) are gone now.
+        self._finished_checksums.clear()
+        self._checksums.clear()
+        url, duration = self._current_entry
+        if filepath in self._cached_paths:
+            # Downloaded file kept as-is: it must not share bytes with the cache.
+            StreamCache.detach(filepath)
+        self._cached_paths.clear()
+        # This item is complete: its files must survive a later cancel.
+        self._job_outputs.clear()
+        self.verifier.submit(filepath, url, checksum, duration)
+        if self.fanout_pp is not None:
+            for extra in self.fanout_pp.extra_outputs:
+                self.verifier.submit(extra, url, None, duration)
+            self.fanout_pp.extra_outputs.clear()
+        if url != self._current_job_url:
+            # Playlist entry; the playlist's own row is finished by _run_scheduled.
+            self.job_state_signal.emit(url, 'Done')
+
+    def _track_checksum(self, d):
+        if d['status'] == 'downloading' and d.get('tmpfilename'):
+            self._checksums.setdefault(d['tmpfilename'], StreamingChecksum()).feed_from(d['tmpfilename'])
+        elif d['status'] == 'finished' and d.get('filename'):
+            filename = d['filename']
+            checksum = None
+            for key in (d.get('tmpfilename'), filename + '.part', filename):
+                checksum = self._checksums.pop(key, None) or checksum
+            if checksum is not None:
+                # The .part file has been renamed; pick up the unflushed tail.
+                checksum.feed_from(d['filename'])
+                self._finished_checksums[d['filename']] = (checksum.algo, checksum.hexdigest())
+
+    def _cache_stream(self, d, info):
+        key = StreamCache.make_key(info)
+        filename = d.get('filename')
+        if key is None or not filename or not os.path.isfile(filename):
+            return
+        try:
+            self.stream_cache.store(key, filename)
+            if self.verifier.ffprobe_path:
+                # Only verified items can be requeued, so only they need this.
+                self._cache_keys.setdefault(self._current_entry[0], set()).add(key)
+            self._cached_paths.add(filename)
+        except OSError as exc:
+            self.cache_signal.emit(f"⚠️ Could not cache {os.path.basename(filename)}: {exc}")
+
+    def _interruptible_sleep(self, seconds):
+        self._stage = 'backoff'
+        deadline = time.monotonic() + seconds
+        while not self._is_cancelled:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if self._is_paused:
+                # The pause may have landed before _stage said 'backoff'.
+                self._report_interrupt('Paused')
+            self._state_changed.wait(remaining)
+            self._state_changed.clear()
+        raise DownloadCancelledException('Download cancelled by user.')
+
+    def postprocessor_hook(self, d):
+        self._stage = 'postprocessing'
+        self._note_job_files(d.get('info_dict') or {})
+
+    def progress_hook(self, d):
+        self._check_interrupt()
+        info = d.get('info_dict') or {}
+        if d['status'] == 'downloading':
+            self._stage = 'downloading'
+        self._note_job_files(info, d)
+        key = self._current_job_url
+        if info.get('playlist_index') is not None and info.get('webpage_url'):
+            # Playlist entries get their own row in the queue view.
+            key = info['webpage_url']
+        self._current_entry = (key, info.get('duration'))
+        self._track_checksum(d)
+        if d['status'] == 'finished' and self.stream_cache is not None:
+            self._cache_stream(d, info)
         if d['status'] in ('downloading', 'finished', 'error', 'postprocessing'):
-            self.progress_signal.emit(d)
+            self.progress_signal.emit(dict(d, job_key=key))
         return None
 
+    # pause(), resume() and cancel() are called directly from the GUI thread.
+
     def pause(self):
+        self._interrupt_requested_at = time.perf_counter()
         self._is_paused = True
+        self._state_changed.set()
+        self._abort_inflight()
+        if hasattr(signal, 'SIGSTOP'):
+            # ffmpeg holds no connection; freeze it rather than lose its work.
+            _signal_children(signal.SIGSTOP)
+        if self._stage in ('postprocessing', 'backoff', 'verifying'):
+            self._report_interrupt('Paused')
         self.paused_signal.emit()
 
     def resume(self):
+        if hasattr(signal, 'SIGCONT'):
+            _signal_children(signal.SIGCONT)
         self._is_paused = False
+        self._state_changed.set()
         self.resumed_signal.emit()
 
     def cancel(self):
+        self._interrupt_requested_at = time.perf_counter()
         self._is_cancelled = True
+        self._state_changed.set()
+        self._abort_inflight()
+        _terminate_children()
+
+
+# ---------------------------------------------------------------------------
+# Worker fleet: shared file-based job queue with leases (--worker mode)
+# ---------------------------------------------------------------------------
+
+LEASE_SECONDS = 120
+
+
+class JobLease:
+    """A claimed job; name is the leased file name, which encodes owner and expiry."""
+
+    def __init__(self, job_id, name, job):
+        self.job_id = job_id
+        self.name = name
+        self.job = job
+
+
+class FileJobQueue:
+    """
+    Job queue kept as one JSON file per job under root, which may be a
+    shared directory mounted on several hosts. Every state change is a
+    single os.rename, so claiming needs no server and no locks: of several
+    processes renaming the same pending file, exactly one succeeds.
+
+    A leased file is named '<job id>@<worker id>@<expiry>'. The owner renews
+    by renaming it to a later expiry; anyone may move an expired lease back
+    to pending, so jobs of crashed workers are picked up again. Delivery is
+    at-least-once, and hosts need roughly synchronised clocks.
+    """
+    STATES = ('pending', 'leased', 'done', 'failed')
+
+    def __init__(self, root, lease_seconds=LEASE_SECONDS, max_attempts=3):
+        self.root = root
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        for state in self.STATES + ('tmp',):
+            os.makedirs(os.path.join(root, state), exist_ok=True)
+
+    @staticmethod
+    def job_id(url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()[:20]
+
+    def _path(self, state, name):
+        return os.path.join(self.root, state, name)
+
+    def _write(self, state, name, data):
+        """Write data to state/name atomically (tmp file + rename)."""
+        tmp = self._path('tmp', f'{name}.{os.getpid()}.{threading.get_ident()}')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, self._path(state, name))
+
+    def enqueue(self, url):
+        """Add url unless it is already pending, leased, done or failed. Returns True if added."""
+        job_id = self.job_id(url)
+        name = job_id + '.json'
+        if any(os.path.exists(self._path(state, name)) for state in ('pending', 'done', 'failed')):
+            return False
+        if self._is_leased(job_id):
+            return False
+        self._write('pending', name, {'url': url, 'attempts': 0})
+        return True
+
+    def _is_leased(self, job_id):
+        with os.scandir(os.path.join(self.root, 'leased')) as entries:
+            return any(entry.name.startswith(job_id + '@') for entry in entries)
+
+    def claim(self, worker_id):
+        """Lease the next pending job for worker_id, or return None."""
+        with os.scandir(os.path.join(self.root, 'pending')) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json'):
+                    continue
+                job_id = entry.name[:-len('.json')]
+                name = f'{job_id}@{worker_id}@{time.time() + self.lease_seconds:.0f}'
+                try:
+                    os.rename(entry.path, self._path('leased', name))
+                except FileNotFoundError:
+                    continue   # another worker was faster
+                with open(self._path('leased', name), 'r', encoding='utf-8') as f:
+                    return JobLease(job_id, name, json.load(f))
+        return None
+
+    def renew(self, lease):
+        """Extend the lease. Returns False if it was lost (expired and reclaimed)."""
+        job_id, worker_id, _expiry = lease.name.split('@')
+        name = f'{job_id}@{worker_id}@{time.time() + self.lease_seconds:.0f}'
+        try:
+            os.rename(self._path('leased', lease.name), self._path('leased', name))
+        except FileNotFoundError:
+            return False
+        lease.name = name
+        return True
+
+    def complete(self, lease, result):
+        self._write('done', lease.job_id + '.json', dict(lease.job, **result))
+        self._release(lease)
+
+    def fail(self, lease, error):
+        """Put the job back in pending, or in failed once max_attempts is reached."""
+        state = self._retry_or_fail(lease.job_id, lease.job, error)
+        self._release(lease)
+        return state
+
+    def _retry_or_fail(self, job_id, job, error):
+        job = dict(job, attempts=job.get('attempts', 0) + 1, last_error=error)
+        state = 'failed' if job['attempts'] >= self.max_attempts else 'pending'
+        self._write(state, job_id + '.json', job)
+        return state
+
+    def _release(self, lease):
+        try:
+            os.remove(self._path('leased', lease.name))
+        except FileNotFoundError:
+            pass
+
+    def reap_expired(self):
+        """
+        Return jobs whose lease expired to pending, counting the lost lease
+        as a failed attempt, so a job that keeps killing its worker ends up
+        in failed. Returns how many were reclaimed.
+        """
+        now = time.time()
+        reclaimed = 0
+        with os.scandir(os.path.join(self.root, 'leased')) as entries:
+            for entry in entries:
+                try:
+                    job_id, worker_id, expiry = entry.name.split('@')
+                    if float(expiry) >= now:
+                        continue
+                    # Claim the expired lease first; of several reapers only one wins.
+                    reaping = self._path('tmp', f'{entry.name}.reap.{os.getpid()}')
+                    os.rename(entry.path, reaping)
+                except (ValueError, FileNotFoundError):
+                    continue
+                try:
+                    with open(reaping, 'r', encoding='utf-8') as f:
+                        job = json.load(f)
+                except (OSError, ValueError):
+                    os.replace(reaping, self._path('pending', job_id + '.json'))
+                else:
+                    self._retry_or_fail(job_id, job, f'lease of {worker_id} expired')
+                    os.remove(reaping)
+                reclaimed += 1
+        return reclaimed
+
+    def counts(self):
+        return {state: sum(1 for _ in os.scandir(os.path.join(self.root, state))) for state in self.STATES}
+
+    def throughput(self, since=0.0):
+        """
+        Return (jobs, bytes, seconds) over the jobs completed at or after
+        since (a time.time() value), all workers together.
+        """
+        jobs, total_bytes, first_start, last_finish = 0, 0, None, None
+        with os.scandir(os.path.join(self.root, 'done')) as entries:
+            for entry in entries:
+                try:
+                    with open(entry.path, 'r', encoding='utf-8') as f:
+                        record = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if record.get('finished', 0) < since:
+                    continue
+                jobs += 1
+                total_bytes += record.get('bytes', 0)
+                first_start = min(filter(None, (first_start, record.get('started'))), default=None)
+                last_finish = max(filter(None, (last_finish, record.get('finished'))), default=None)
+        seconds = (last_finish - first_start) if first_start and last_finish else 0.0
+        return jobs, total_bytes, seconds
+
+
+def _default_worker_id():
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', f'{platform.node()}-{os.getpid()}')
+
+
+class FleetWorker:
+    """
+    Headless worker process: claims jobs from a FileJobQueue, downloads
+    them with yt-dlp and renews its lease in the background until the
+    queue is drained (or forever with wait=True).
+    """
+
+    def __init__(self, queue, options, worker_id=None, wait=False, poll_interval=2.0, log=None):
+        self.queue = queue
+        self.options = options
+        self.worker_id = worker_id or _default_worker_id()
+        self.wait = wait
+        self.poll_interval = poll_interval
+        # Several processes share one terminal: flush so lines don't interleave.
+        self.log = log or functools.partial(print, flush=True)
+        self._lease_lost = threading.Event()
+        self._bytes = 0
+
+    def run(self):
+        processed = 0
+        while True:
+            reclaimed = self.queue.reap_expired()
+            if reclaimed:
+                self.log(f'[{self.worker_id}] reclaimed {reclaimed} expired lease(s)')
+            lease = self.queue.claim(self.worker_id)
+            if lease is None:
+                counts = self.queue.counts()
+                # Leases held by others may still expire and come back.
+                if not self.wait and not counts['pending'] and not counts['leased']:
+                    return processed
+                time.sleep(self.poll_interval)
+                continue
+            self._process(lease)
+            processed += 1
+
+    def _process(self, lease):
+        url = lease.job['url']
+        self._lease_lost.clear()
+        self._bytes = 0
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(lease, stop), daemon=True)
+        heartbeat.start()
+        started = time.time()
+        error = None
+        try:
+            with yt_dlp.YoutubeDL(dict(self.options, progress_hooks=[self._progress_hook])) as ydl:
+                ydl.download([url])
+        except (Exception, DownloadCancelledException) as exc:
+            error = str(exc)
+        finally:
+            stop.set()
+            heartbeat.join()
+        if self._lease_lost.is_set():
+            self.log(f'[{self.worker_id}] lost the lease on {url}; another worker will redo it')
+        elif error is None:
+            self.queue.complete(lease, {'worker': self.worker_id, 'started': started,
+                                        'finished': time.time(), 'bytes': self._bytes})
+            self.log(f'[{self.worker_id}] done {url} ({_format_bytes(self._bytes)})')
+        else:
+            state = self.queue.fail(lease, error)
+            self.log(f'[{self.worker_id}] failed {url} -> {state}: {error}')
+
+    def _heartbeat(self, lease, stop):
+        while not stop.wait(self.queue.lease_seconds / 3):
+            if not self.queue.renew(lease):
+                self._lease_lost.set()
+                return
+
+    def _progress_hook(self, d):
+        if self._lease_lost.is_set():
+            raise DownloadCancelledException('Lease lost.')
+        if d['status'] == 'finished':
+            self._bytes += d.get('total_bytes') or d.get('downloaded_bytes') or 0
+
+
+def run_worker_fleet(count, worker_args, queue, log=print):
+    """Start count '--worker' processes of this script, wait, and report throughput."""
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker'] + worker_args
+    started = time.time()
+    procs = [subprocess.Popen(cmd) for _ in range(count)]
+    exit_code = 0
+    for proc in procs:
+        exit_code = proc.wait() or exit_code
+    jobs, total_bytes, seconds = queue.throughput(since=started)
+    rate = total_bytes / seconds if seconds else 0
+    log(f'{jobs} job(s), {_format_bytes(total_bytes) or "0 B"} in {seconds:.1f}s '
+        f'-> {_format_bytes(rate) or "0 B"}/s across all workers; queue: {queue.counts()}')
+    return exit_code
+
+
+# ---------------------------------------------------------------------------
+# Job queue model (backs a virtualized QTableView)
+# ---------------------------------------------------------------------------
+
+def _format_bytes(num):
+    if not num:
+        return ''
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if num < 1024:
+            return f'{num:.0f} {unit}' if unit == 'B' else f'{num:.1f} {unit}'
+        num /= 1024
+    return f'{num:.1f} TiB'
+
+
+def _format_eta(seconds):
+    if seconds is None:
+        return ''
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}:{minutes:02d}:{seconds:02d}' if hours else f'{minutes}:{seconds:02d}'
+
+
+class JobQueueModel(QAbstractTableModel):
+    """
+    One row per job. Updates only touch plain Python lists and mark the row
+    dirty; a timer flushes new rows with one beginInsertRows() and dirty
+    rows as a few contiguous dataChanged ranges, so thousands of rows and
+    dozens of active jobs cost the view a handful of repaints per second.
+    """
+    COLUMNS = ('Item', 'Status', 'Progress', 'Speed', 'ETA', 'Size')
+    TITLE, STATUS, PERCENT, SPEED, ETA, SIZE = range(len(COLUMNS))
+    SORT_ROLE = Qt.ItemDataRole.UserRole
+
+    # More separate runs than this are merged into a single range.
+    _MAX_RANGES = 32
+
+    def __init__(self, parent=None, flush_interval_ms=100):
+        super().__init__(parent)
+        self._keys = []
+        self._rows = []          # [title, status, percent, speed, eta, size] per job
+        self._row_of = {}        # key -> row number
+        self._visible = 0        # rows announced to the view so far
+        self._dirty = set()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(flush_interval_ms)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._visible
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        value = self._rows[row][col]
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == self.PERCENT:
+                return f'{value:.1f}%' if value is not None else ''
+            if col == self.SPEED:
+                return f'{_format_bytes(value)}/s' if value else ''
+            if col == self.ETA:
+                return _format_eta(value)
+            if col == self.SIZE:
+                return _format_bytes(value)
+            return value
+        if role == self.SORT_ROLE:
+            if col in (self.TITLE, self.STATUS):
+                return value
+            return value if value is not None else -1
+        if role == Qt.ItemDataRole.ToolTipRole and col == self.TITLE:
+            return self._keys[row]
+        if role == Qt.ItemDataRole.TextAlignmentRole and col >= self.PERCENT:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def clear(self):
+        self.beginResetModel()
+        self._keys, self._rows, self._row_of = [], [], {}
+        self._visible = 0
+        self._dirty.clear()
+        self.endResetModel()
+
+    def update_job(self, key, title=None, status=None, percent=None, speed=None, eta=None, size=None):
+        """Create or update the row for key; None leaves a field unchanged."""
+        row = self._row_of.get(key)
+        if row is None:
+            row = len(self._rows)
+            self._row_of[key] = row
+            self._keys.append(key)
+            self._rows.append([key, 'Queued', None, None, None, None])
+        values = self._rows[row]
+        changed = False
+        for col, value in ((self.TITLE, title), (self.STATUS, status), (self.PERCENT, percent),
+                           (self.SPEED, speed), (self.ETA, eta), (self.SIZE, size)):
+            if value is not None and values[col] != value:
+                values[col] = value
+                changed = True
+        if changed and row < self._visible:
+            self._dirty.add(row)
+
+    def flush(self):
+        if len(self._rows) > self._visible:
+            self.beginInsertRows(QModelIndex(), self._visible, len(self._rows) - 1)
+            self._visible = len(self._rows)
+            self.endInsertRows()
+        if not self._dirty:
+            return
+        rows = sorted(self._dirty)
+        self._dirty.clear()
+        ranges = []
+        start = prev = rows[0]
+        for row in rows[1:]:
+            if row != prev + 1:
+                ranges.append((start, prev))
+                start = row
+            prev = row
+        ranges.append((start, prev))
+        if len(ranges) > self._MAX_RANGES:
+            ranges = [(rows[0], rows[-1])]
+        last_col = len(self.COLUMNS) - 1
+        for first, last in ranges:
+            self.dataChanged.emit(self.index(first, 0), self.index(last, last_col))
 
 
 # ---------------------------------------------------------------------------
@@ -302,6 +2452,7 @@ class PreviewWorker(QObject):
         super().__init__()
         self.url = url
 
+    @profiled
     def run(self):
         try:
             with yt_dlp.YoutubeDL({'quiet': True, 'socket_timeout': 10}) as ydl:
@@ -396,12 +2547,16 @@ class VideoPreviewDialog(QDialog):
 # ---------------------------------------------------------------------------
 
 class VideoDownloader(QWidget):
-    def __init__(self):
+    def __init__(self, url_sources=None):
         super().__init__()
         self.settings = QSettings('MyOrganization', 'WizVid')
         self.download_path = self.settings.value('download_path', os.path.expanduser('~'))
         self.ffmpeg_path = None          # resolved after startup
+        self.failed_urls = self._load_failed_urls()
+        cache_gb = self.settings.value('stream_cache_max_gb', 5.0, type=float)
+        self.stream_cache = StreamCache(max_bytes=int(cache_gb * 1024 ** 3)) if cache_gb > 0 else None
         self.init_ui()
+        self._set_url_sources(url_sources or [])
         self.download_thread = None
         self.download_worker = None
         self.preview_thread = None
@@ -464,15 +2619,15 @@ class VideoDownloader(QWidget):
 
     def _on_ytdlp_update_found(self, current, latest):
         self.status.append(
-            f"🔔 yt-dlp update found! {current} → {latest}. Installing in background …"
+            f"🔔 yt-dlp update found! {current} → {latest}. Staging it in the background …"
         )
 
     def _on_ytdlp_update_done(self, new_version):
         QMessageBox.information(
             self,
             "yt-dlp Updated",
-            f"✅ yt-dlp has been updated to version {new_version}.\n"
-            "Please restart WizVid to use the new version."
+            f"✅ yt-dlp {new_version} has been downloaded.\n"
+            "It will be used the next time you start WizVid."
         )
 
     # ------------------------------------------------------------------
@@ -481,7 +2636,7 @@ class VideoDownloader(QWidget):
 
     def init_ui(self):
         self.setWindowTitle('✨ WizVid - Fantasy Downloader ✨')
-        self.setGeometry(300, 50, 600, 500)
+        self.setGeometry(300, 50, 760, 720)
         self.setStyleSheet(self.fantasy_style())
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
@@ -498,8 +2653,15 @@ class VideoDownloader(QWidget):
         self.setup_fade_effect(self.title_label)
         url_container = QVBoxLayout()
         url_container.setSpacing(5)
+        url_header = QHBoxLayout()
         self.label = QLabel('Enter Video/Playlist URLs (one per line):')
-        url_container.addWidget(self.label)
+        url_header.addWidget(self.label)
+        self.url_list_button = QPushButton('📄 Load List')
+        self.url_list_button.setFixedWidth(140)
+        self.url_list_button.setToolTip('Stream URLs from a text file instead of pasting them.')
+        self.url_list_button.clicked.connect(self.select_url_list)
+        url_header.addWidget(self.url_list_button)
+        url_container.addLayout(url_header)
         self.url_input = QTextEdit(self)
         self.url_input.setMinimumHeight(100)
         url_container.addWidget(self.url_input)
@@ -533,6 +2695,28 @@ class VideoDownloader(QWidget):
         self.format_dropdown.setFixedWidth(150)
         self.format_dropdown.currentIndexChanged.connect(self.save_preferences)
         format_container.addWidget(self.format_dropdown)
+        self.extra_formats_button = QPushButton()
+        self.extra_formats_button.setFixedWidth(150)
+        self.extra_formats_button.setToolTip(
+            'Produce these formats too, from the same download and a single ffmpeg pass.')
+        self.extra_formats_menu = QMenu(self)
+        saved_extras = self._load_extra_formats()
+        for name in FANOUT_TARGETS:
+            action = self.extra_formats_menu.addAction(name)
+            action.setCheckable(True)
+            action.setChecked(name in saved_extras)
+            action.toggled.connect(self.save_preferences)
+        self.extra_formats_button.setMenu(self.extra_formats_menu)
+        self._update_extra_formats_button()
+        format_container.addWidget(self.extra_formats_button)
+        self.verify_checkbox = QCheckBox('🔎 Verify files')
+        self.verify_checkbox.setToolTip(
+            'Check finished files with ffprobe and re-download broken ones.\n'
+            'Merged videos and MP3s are read back once to checksum them; '
+            'only single-file downloads are hashed while they download.')
+        self.verify_checkbox.setChecked(self.settings.value('verify_downloads', False, type=bool))
+        self.verify_checkbox.toggled.connect(self.save_preferences)
+        format_container.addWidget(self.verify_checkbox)
         settings_container.addLayout(format_container)
         layout.addLayout(settings_container)
         button_container = QHBoxLayout()
@@ -566,6 +2750,12 @@ class VideoDownloader(QWidget):
         self.cancel_button.clicked.connect(self.cancel_download)
         self.cancel_button.setEnabled(False)
         control_button_container.addWidget(self.cancel_button)
+        self.retry_failed_button = QPushButton('🔁 Retry Failed')
+        self.retry_failed_button.setFixedHeight(35)
+        self.retry_failed_button.setFixedWidth(140)
+        self.retry_failed_button.clicked.connect(self.retry_failed_downloads)
+        self.retry_failed_button.setEnabled(bool(self.failed_urls))
+        control_button_container.addWidget(self.retry_failed_button)
         layout.addLayout(control_button_container)
         progress_container = QVBoxLayout()
         progress_container.setSpacing(5)
@@ -590,6 +2780,37 @@ class VideoDownloader(QWidget):
         """)
         progress_container.addWidget(self.progress)
         layout.addLayout(progress_container)
+        queue_header = QHBoxLayout()
+        queue_header.addWidget(QLabel('Queue:'))
+        self.queue_filter = QComboBox(self)
+        self.queue_filter.addItems(
+            ['All', 'Queued', 'Starting', 'Downloading', 'Processing', 'Retrying', 'Paused', 'Done', 'Failed'])
+        self.queue_filter.currentTextChanged.connect(self.filter_queue)
+        queue_header.addWidget(self.queue_filter)
+        queue_header.addStretch()
+        layout.addLayout(queue_header)
+        self.queue_model = JobQueueModel(self)
+        self.queue_proxy = QSortFilterProxyModel(self)
+        self.queue_proxy.setSourceModel(self.queue_model)
+        self.queue_proxy.setSortRole(JobQueueModel.SORT_ROLE)
+        self.queue_proxy.setFilterKeyColumn(JobQueueModel.STATUS)
+        self.queue_view = QTableView(self)
+        self.queue_view.setModel(self.queue_proxy)
+        # Start unsorted (queue order); clicking a header sorts through the proxy.
+        self.queue_view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.queue_view.setSortingEnabled(True)
+        self.queue_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.queue_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.queue_view.setWordWrap(False)
+        # Fixed row heights and column widths keep layout O(visible rows).
+        self.queue_view.verticalHeader().setVisible(False)
+        self.queue_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.queue_view.verticalHeader().setDefaultSectionSize(24)
+        header = self.queue_view.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(JobQueueModel.TITLE, QHeaderView.ResizeMode.Stretch)
+        self.queue_view.setMinimumHeight(160)
+        layout.addWidget(self.queue_view)
         self.status = QTextEdit(self)
         self.status.setReadOnly(True)
         self.status.setStyleSheet("""
@@ -638,6 +2859,21 @@ class VideoDownloader(QWidget):
                 font-weight: normal;
                 min-width: 120px;
             }
+            QTableView {
+                background-color: rgba(10, 20, 40, 0.5);
+                alternate-background-color: rgba(20, 30, 50, 0.5);
+                border: 1px solid #3a4a6b;
+                border-radius: 5px;
+                gridline-color: #243b55;
+                selection-background-color: #3a4a6b;
+                font-weight: normal;
+            }
+            QHeaderView::section {
+                background: #1b2a49;
+                color: #e0f7ff;
+                border: 1px solid #3a4a6b;
+                padding: 4px;
+            }
             QComboBox QAbstractItemView {
                 background-color: #121a2e;
                 border: 1px solid #3a4a6b;
@@ -699,8 +2935,24 @@ class VideoDownloader(QWidget):
     def save_preferences(self):
         self.settings.setValue('download_path', self.download_path)
         self.settings.setValue('download_format', self.format_dropdown.currentText())
+        self.settings.setValue('verify_downloads', self.verify_checkbox.isChecked())
+        self.settings.setValue('extra_formats', json.dumps(self.selected_extra_formats()))
+        self._update_extra_formats_button()
         self.status.append('⚙️ Preferences saved!')
 
+    def _load_extra_formats(self):
+        try:
+            return json.loads(self.settings.value('extra_formats', '[]'))
+        except (TypeError, ValueError):
+            return []
+
+    def selected_extra_formats(self):
+        return [action.text() for action in self.extra_formats_menu.actions() if action.isChecked()]
+
+    def _update_extra_formats_button(self):
+        count = len(self.selected_extra_formats())
+        self.extra_formats_button.setText(f'➕ Also Save ({count})' if count else '➕ Also Save')
+
     def preview_video(self):
         urls = [url for url in self.url_input.toPlainText().strip().split('\n') if url]
         if not urls:
@@ -736,6 +2988,8 @@ class VideoDownloader(QWidget):
         return re.sub('\\x1B(?:[@-Z\\\\-_]|\\[[0-?]*[ -/]*[@-~])', '', text)
 
     def update_progress(self, d):
+        key = d.get('job_key')
+        info = d.get('info_dict') or {}
         if d['status'] == 'downloading':
             percent_str = self.remove_ansi_codes(d.get('_percent_str', '0.0%'))
             percent = 0.0
@@ -746,60 +3000,104 @@ class VideoDownloader(QWidget):
             speed_str = self.remove_ansi_codes(d.get('_speed_str', 'N/A'))
             self.progress.setValue(int(percent))
             self.speed_label.setText(f'⚡ Speed: {speed_str}')
-            self.status.append(f'💾 Downloading... {percent:.2f}%')
-            QApplication.processEvents()
+            if key:
+                self.queue_model.update_job(
+                    key, title=info.get('title'), status='Downloading', percent=percent,
+                    speed=d.get('speed'), eta=d.get('eta'),
+                    size=d.get('total_bytes') or d.get('total_bytes_estimate'))
+        elif d['status'] == 'finished' and key:
+            self.queue_model.update_job(key, title=info.get('title'), status='Processing', percent=100.0)
+
+    def update_job_state(self, key, state):
+        self.queue_model.update_job(key, status=state)
+
+    def filter_queue(self, state):
+        self.queue_proxy.setFilterFixedString('' if state == 'All' else state)
+
+    def select_url_list(self):
+        if self.url_sources:
+            self._set_url_sources([])
+            return None
+        path, _ = QFileDialog.getOpenFileName(self, 'Select URL List', self.download_path,
+                                              'URL lists (*.txt *.list *.urls);;All files (*)')
+        if path:
+            self._set_url_sources([path])
+
+    def _set_url_sources(self, sources):
+        self.url_sources = list(sources)
+        if self.url_sources:
+            names = ', '.join('stdin' if s == '-' else os.path.basename(s.rstrip(os.sep)) for s in self.url_sources)
+            self.label.setText(f'📄 Streaming URLs from: {names}')
+            self.url_list_button.setText('✖ Clear List')
+        else:
+            self.label.setText('Enter Video/Playlist URLs (one per line):')
+            self.url_list_button.setText('📄 Load List')
 
     def start_download(self):
-        urls = [url for url in self.url_input.toPlainText().strip().split('\n') if url]
-        if not urls:
+        text = self.url_input.toPlainText().strip()
+        if not text and not self.url_sources:
             QMessageBox.warning(self, 'Input Error', '⚠️ Please enter at least one video or playlist URL!')
             self.status.append('⚠️ Please enter at least one video or playlist URL!')
             return None
+        # Typed URLs first, then the list sources; everything is read lazily
+        # by the download thread and deduplicated across both.
+        deduper = UrlDeduper()
+        urls = itertools.chain(iter_urls(text.splitlines(), deduper),
+                               iter_url_sources(self.url_sources, deduper))
+        self._start_download_for(urls)
+
+    def retry_failed_downloads(self):
+        if not self.failed_urls:
+            return None
+        urls = list(self.failed_urls)
+        self._set_failed_urls([])
+        self._start_download_for(urls)
+        self.status.append(f'🔁 Retrying {len(urls)} previously failed item(s).')
+
+    def _load_failed_urls(self):
+        try:
+            return json.loads(self.settings.value('failed_urls', '[]'))
+        except (TypeError, ValueError):
+            return []
+
+    def _set_failed_urls(self, urls):
+        self.failed_urls = list(urls)
+        self.settings.setValue('failed_urls', json.dumps(self.failed_urls))
+        self.retry_failed_button.setEnabled(bool(self.failed_urls))
+
+    def _start_download_for(self, urls):
         self.download_button.setEnabled(False)
         self.preview_button.setEnabled(False)
+        self.retry_failed_button.setEnabled(False)
         self.pause_button.setEnabled(True)
         self.cancel_button.setEnabled(True)
         self.resume_button.setEnabled(False)
         self.progress.setValue(0)
         self.speed_label.setText('⚡ Speed: Connecting...')
         self.status.clear()
-        self.status.append(f'🚀 Starting download for {len(urls)} item(s) to: {self.download_path}')
+        self.queue_model.clear()
+        self.status.append(f'🚀 Starting download to: {self.download_path}')
         selected_format = self.format_dropdown.currentText()
-        options = {
-            'outtmpl': os.path.join(self.download_path, '%(title)s.%(ext)s'),
-            'noprogress': True,
-            'external_downloader_args': ['-loglevel', 'error', '-y']
-        }
-        # Supply ffmpeg location to yt-dlp if we resolved it
-        if self.ffmpeg_path and os.path.isfile(self.ffmpeg_path):
-            options['ffmpeg_location'] = os.path.dirname(self.ffmpeg_path)
-        if selected_format == 'Best Video':
-            options['format'] = 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'
-            options['merge_output_format'] = 'mp4'
-        elif selected_format == 'Best Audio':
-            options['format'] = 'bestaudio/best'
-            options['extract_audio'] = True
-            options['audio_format'] = 'mp3'
-            options['postprocessors'] = [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192'
-            }, {'key': 'FFmpegMetadata'}]
-        elif selected_format == 'MP3':
-            options['format'] = 'bestaudio/best'
-            options['extract_audio'] = True
-            options['audio_format'] = 'mp3'
-            options['postprocessors'] = [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '320'
-            }, {'key': 'FFmpegMetadata'}]
-        elif 'MP4' in selected_format:
-            resolution = selected_format.split(' ')[1][:-1]
-            options['format'] = f'bestvideo[ext=mp4][height<={resolution}]+bestaudio[ext=m4a]/best[ext=mp4]/best'
-            options['merge_output_format'] = 'mp4'
+        options = build_download_options(self.download_path, selected_format, self.ffmpeg_path)
+        targets = list(dict.fromkeys([selected_format] + self.selected_extra_formats()))
+        fanout_targets = None
+        if len(targets) > 1:
+            # One download of the best source any target needs, then one ffmpeg
+            # pass writes every format; the single-format postprocessors go.
+            fanout_targets = targets
+            for key in ('format', 'merge_output_format', 'extract_audio', 'audio_format', 'postprocessors'):
+                options.pop(key, None)
+            options.update(fanout_download_options(targets))
+            self.status.append(f'🎛️ Producing {", ".join(targets)} from a single download.')
+        ffprobe_path = None
+        if self.verify_checkbox.isChecked():
+            ffprobe_path = _find_ffprobe(self.ffmpeg_path)
+            if not ffprobe_path:
+                self.status.append('⚠️ ffprobe not found – files will be checksummed but not verified.')
         self.download_thread = QThread()
-        self.download_worker = DownloadWorker(urls, options)
+        self.download_worker = DownloadWorker(urls, options, verifier=IntegrityVerifier(ffprobe_path),
+                                              fanout_targets=fanout_targets, ffmpeg_path=self.ffmpeg_path,
+                                              stream_cache=self.stream_cache)
         self.download_worker.moveToThread(self.download_thread)
         self.download_thread.started.connect(self.download_worker.run)
         self.download_worker.progress_signal.connect(self.update_progress)
@@ -809,6 +3107,12 @@ class VideoDownloader(QWidget):
         self.download_worker.paused_signal.connect(self.download_paused)
         self.download_worker.resumed_signal.connect(self.download_resumed)
         self.download_worker.cancelled_signal.connect(self.download_cancelled)
+        self.download_worker.retry_signal.connect(self.status.append)
+        self.download_worker.integrity_signal.connect(self.status.append)
+        self.download_worker.job_state_signal.connect(self.update_job_state)
+        self.download_worker.cache_signal.connect(self.status.append)
+        self.download_worker.control_signal.connect(self.status.append)
+        self.download_worker.failed_items_signal.connect(self.record_failed_items)
         self.download_worker.finished_signal.connect(self.download_thread.quit)
         self.download_worker.error_signal.connect(self.download_thread.quit)
         self.download_worker.cancelled_signal.connect(self.download_thread.quit)
@@ -848,10 +3152,16 @@ class VideoDownloader(QWidget):
         self.pause_button.setEnabled(False)
         self.resume_button.setEnabled(False)
         self.cancel_button.setEnabled(False)
+        self.retry_failed_button.setEnabled(bool(self.failed_urls))
         self.progress.setValue(0)
         self.speed_label.setText('⚡ Speed: Cancelled')
         self.current_playlist_folder = None
 
+    def record_failed_items(self, urls):
+        merged = list(dict.fromkeys(self.failed_urls + urls))
+        self._set_failed_urls(merged)
+        self.status.append(f'⚠️ {len(urls)} item(s) failed. Use "Retry Failed" to try them again later.')
+
     def set_playlist_folder(self, playlist_name):
         safe_playlist_name = re.sub('[\\\\/:*?\"<>|]', '', playlist_name)
         self.current_playlist_folder = os.path.join(self.download_path, safe_playlist_name)
@@ -865,6 +3175,7 @@ class VideoDownloader(QWidget):
         self.pause_button.setEnabled(False)
         self.resume_button.setEnabled(False)
         self.cancel_button.setEnabled(False)
+        self.retry_failed_button.setEnabled(bool(self.failed_urls))
         self.progress.setValue(100)
         self.speed_label.setText('✅ Speed: Download Finished')
         message = 'Download finished!'
@@ -884,6 +3195,7 @@ class VideoDownloader(QWidget):
         self.pause_button.setEnabled(False)
         self.resume_button.setEnabled(False)
         self.cancel_button.setEnabled(False)
+        self.retry_failed_button.setEnabled(bool(self.failed_urls))
         self.status.append(f'❌ Download error: {error}')
         self.progress.setValue(0)
         self.speed_label.setText('⚡ Speed: Error')
@@ -891,7 +3203,48 @@ class VideoDownloader(QWidget):
 
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    window = VideoDownloader()
+    parser = argparse.ArgumentParser(description='WizVid - Fantasy Downloader')
+    parser.add_argument('--urls-from', action='append', default=[], metavar='PATH',
+                        help="URL list file or directory of lists to stream from ('-' for stdin); repeatable")
+    parser.add_argument('--profile', nargs='?', const='', default=os.environ.get('WIZVID_PROFILE'),
+                        metavar='DIR', help='profile worker threads, GUI latency and memory into DIR '
+                                            '(also enabled by WIZVID_PROFILE=1 or WIZVID_PROFILE=DIR)')
+    fleet = parser.add_argument_group('worker fleet (headless)')
+    fleet.add_argument('--queue', metavar='DIR', help='shared job queue directory')
+    fleet.add_argument('--enqueue', action='store_true', help='add the --urls-from URLs to --queue and exit')
+    fleet.add_argument('--worker', action='store_true', help='process jobs from --queue until it is drained')
+    fleet.add_argument('--workers', type=int, metavar='N', help='run N worker processes on this host')
+    fleet.add_argument('--wait', action='store_true', help='workers keep polling an empty queue')
+    fleet.add_argument('--format', default='Best Video', choices=list(FANOUT_TARGETS))
+    fleet.add_argument('--download-dir', default=os.path.expanduser('~'))
+    fleet.add_argument('--lease-seconds', type=int, default=LEASE_SECONDS)
+    args, qt_args = parser.parse_known_args()
+    if args.queue:
+        job_queue = FileJobQueue(args.queue, lease_seconds=args.lease_seconds)
+        if args.enqueue:
+            added = sum(job_queue.enqueue(url) for url in iter_url_sources(args.urls_from))
+            print(f'Queued {added} new job(s); queue: {job_queue.counts()}')
+        if args.workers:
+            ensure_ffmpeg(status_callback=print)   # resolve once, before the workers race for it
+            worker_args = ['--queue', args.queue, '--format', args.format, '--download-dir', args.download_dir,
+                           '--lease-seconds', str(args.lease_seconds)] + (['--wait'] if args.wait else [])
+            sys.exit(run_worker_fleet(args.workers, worker_args, job_queue))
+        if args.worker:
+            options = build_download_options(args.download_dir, args.format, ensure_ffmpeg())
+            options['quiet'] = True
+            FleetWorker(job_queue, options, wait=args.wait).run()
+        if args.enqueue or args.worker:
+            sys.exit(0)
+    if args.profile is not None and args.profile not in ('0', 'false'):
+        profile_dir = args.profile if args.profile not in ('', '1', 'true') else \
+            os.path.join(_profile_root(), time.strftime('%Y%m%d-%H%M%S'))
+        PROFILING_SESSION = ProfilingSession(profile_dir)
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = VideoDownloader(url_sources=args.urls_from)
     window.show()
-    sys.exit(app.exec())
+    if PROFILING_SESSION is None:
+        sys.exit(app.exec())
+    PROFILING_SESSION.start_gui_monitoring(app)
+    exit_code = PROFILING_SESSION.profile_call('GUI', app.exec)
+    print(f'Profiling report written to {PROFILING_SESSION.finish()}')
+    sys.exit(exit_code)